@@ -119,6 +119,59 @@ CREATE TABLE results.granular_scores (
 );
 GO
 
+-- =============================================
+-- Bulk Insert Types & Procedures
+-- =============================================
+
+-- Table-valued parameter for batch inserts into staging.job_postings_clean
+-- (columns in the same order as the table)
+CREATE TYPE dbo.CleanedJobType AS TABLE (
+    job_id INT PRIMARY KEY,
+    job_title_clean NVARCHAR(500),
+    company NVARCHAR(500),
+    location NVARCHAR(500),
+    description_clean NVARCHAR(MAX),
+    qualifications_required NVARCHAR(MAX),
+    qualifications_bonus NVARCHAR(MAX),
+    responsibilities NVARCHAR(MAX),
+    summary NVARCHAR(MAX),
+    extracted_skills NVARCHAR(MAX),
+    entities NVARCHAR(MAX),
+    action_verbs NVARCHAR(MAX),
+    domain_tags NVARCHAR(MAX),
+    job_url NVARCHAR(1000),
+    date_posted DATE
+);
+GO
+
+-- Insert a batch of cleaned jobs, skipping job_ids already cleaned.
+-- Returns the inserted job_ids.
+CREATE PROCEDURE dbo.SpInsertCleanedJobs
+    @jobs dbo.CleanedJobType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    INSERT INTO staging.job_postings_clean (
+        job_id, job_title_clean, company, location, description_clean,
+        qualifications_required, qualifications_bonus, responsibilities, summary,
+        extracted_skills, entities, action_verbs, domain_tags,
+        job_url, date_posted
+    )
+    OUTPUT inserted.job_id
+    SELECT
+        j.job_id, j.job_title_clean, j.company, j.location, j.description_clean,
+        j.qualifications_required, j.qualifications_bonus, j.responsibilities, j.summary,
+        j.extracted_skills, j.entities, j.action_verbs, j.domain_tags,
+        j.job_url, j.date_posted
+    FROM @jobs j
+    WHERE NOT EXISTS (
+        SELECT 1 FROM staging.job_postings_clean c
+        WHERE c.job_id = j.job_id
+    );
+END
+GO
+
 -- =============================================
 -- Indexes for Performance
 -- =============================================
@@ -135,6 +188,14 @@ CREATE INDEX idx_raw_jobs_processed
     ON staging.raw_jobs(is_processed);
 GO
 
+-- Filtered covering index for the preprocessing queue (get_unprocessed_jobs)
+CREATE INDEX IX_raw_jobs_unprocessed
+    ON staging.raw_jobs(date_ingested DESC)
+    INCLUDE (job_title, company, location, job_description, job_url,
+             date_posted, salary_range, job_type, source)
+    WHERE is_processed = 0;
+GO
+
 -- =============================================
 -- Verification
 -- =============================================
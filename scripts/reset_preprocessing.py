@@ -3,8 +3,12 @@ Reset preprocessing script - clears processed data for fresh analysis.
 Useful when you want to re-process jobs after changing parsing rules.
 """
 
+import os
 import sys
+import shutil
+import fnmatch
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -13,6 +17,57 @@ from src.config import PROCESSED_DATA_DIR, VECTORS_DIR, RESULTS_DIR
 from src.db_utils import clear_staging_tables, clear_results_tables, get_job_count
 
 
+# =============================================
+# Console Text
+# =============================================
+
+# Accepted confirmation answers
+_YES = frozenset({'yes', 'y'})
+
+# Multi-line banners are written with a single print() each
+RULE = "=" * 70
+
+CONFIRM_BANNER = f"""{RULE}
+  RESET PREPROCESSING DATA
+{RULE}
+
+This will DELETE:
+  - All processed job data (staging.job_postings_clean)
+  - All job rankings (results.job_rankings)
+  - All granular scores (results.granular_scores)
+  - The cleaned job cache (data/processed/jobs_clean.parquet)
+  - All embedding files (data/vectors/)
+  - All result exports (data/results/)
+
+Raw job data (staging.raw_jobs) will be preserved.
+
+You will need to re-run:
+  1. python -m src.preprocess
+  2. python -m src.vectorize
+  3. python -m src.rank
+  OR: python -m src.pipeline --skip-ingestion"""
+
+EXECUTING_BANNER = f"""
+{RULE}
+  EXECUTING RESET
+{RULE}"""
+
+COMPLETE_BANNER = f"""
+{RULE}
+  RESET COMPLETE
+{RULE}"""
+
+NEXT_STEPS = """
+✓ Ready for fresh preprocessing!
+
+Next steps:
+  Option 1 (Full pipeline): python -m src.pipeline --skip-ingestion
+  Option 2 (Step-by-step):
+    1. python -m src.preprocess
+    2. python -m src.vectorize
+    3. python -m src.rank"""
+
+
 def confirm_reset() -> bool:
     """
     Ask user to confirm reset action.
@@ -20,24 +75,10 @@ def confirm_reset() -> bool:
     Returns:
         True if confirmed, False otherwise
     """
-    print("="*70)
-    print("  RESET PREPROCESSING DATA")
-    print("="*70)
-    print("\nThis will DELETE:")
-    print("  - All processed job data (staging.job_postings_clean)")
-    print("  - All job rankings (results.job_rankings)")
-    print("  - All granular scores (results.granular_scores)")
-    print("  - All embedding files (data/vectors/)")
-    print("  - All result exports (data/results/)")
-    print("\nRaw job data (staging.raw_jobs) will be preserved.")
-    print("\nYou will need to re-run:")
-    print("  1. python -m src.preprocess")
-    print("  2. python -m src.vectorize")
-    print("  3. python -m src.rank")
-    print("  OR: python -m src.pipeline --skip-ingestion")
+    print(CONFIRM_BANNER)
     
     response = input("\nAre you sure you want to continue? (yes/no): ")
-    return response.lower() in ['yes', 'y']
+    return response.strip().lower() in _YES
 
 
 def delete_files_in_directory(directory: Path, pattern: str = "*") -> int:
@@ -55,59 +96,109 @@ def delete_files_in_directory(directory: Path, pattern: str = "*") -> int:
         return 0
     
     count = 0
-    for file in directory.glob(pattern):
-        if file.is_file():
-            file.unlink()
-            count += 1
+    # scandir reuses directory-entry type info, avoiding a Path object and
+    # extra stat() call per file
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and fnmatch.fnmatchcase(entry.name, pattern):
+                os.unlink(entry.path)
+                count += 1
     
     return count
 
 
+def count_entries(directory: Path) -> int:
+    """Count the top-level entries in a directory (0 if missing)."""
+    if not directory.exists():
+        return 0
+    
+    with os.scandir(directory) as entries:
+        return sum(1 for _ in entries)
+
+
+def wipe_directory(directory: Path) -> int:
+    """
+    Delete everything in a directory by dropping and recreating it.
+    
+    Much faster than unlinking files one at a time from Python when the
+    directory holds many files.
+    
+    Args:
+        directory: Directory to wipe
+        
+    Returns:
+        Number of top-level entries deleted
+    """
+    before = count_entries(directory)
+    if before == 0:
+        return 0
+    
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True, exist_ok=True)
+    
+    # Anything still present (e.g. a locked file) was not deleted
+    return before - count_entries(directory)
+
+
+def clear_database_tables() -> None:
+    """
+    Clear results and staging tables.
+    Results rows reference staging.raw_jobs, so they must be cleared first.
+    """
+    clear_results_tables()
+    clear_staging_tables()
+
+
 def reset_preprocessing() -> None:
     """Execute the reset process."""
-    print("\n" + "="*70)
-    print("  EXECUTING RESET")
-    print("="*70)
-    
-    # 1. Clear database tables
-    print("\n1. Clearing database tables...")
-    try:
-        clear_staging_tables()
-        clear_results_tables()
-        print("  ✓ Database tables cleared")
-    except Exception as e:
-        print(f"  ❌ Error clearing database: {e}")
-        return
+    print(EXECUTING_BANNER)
     
-    # 2. Delete vector files
-    print("\n2. Deleting embedding files...")
-    vector_count = delete_files_in_directory(VECTORS_DIR, "*.parquet")
-    print(f"  ✓ Deleted {vector_count} embedding file(s)")
+    # Database clears and directory wipes touch disjoint resources, so run
+    # them concurrently
+    print("\nClearing database tables, embedding files and result files...")
     
-    # 3. Delete result files
-    print("\n3. Deleting result files...")
-    csv_count = delete_files_in_directory(RESULTS_DIR, "*.csv")
-    json_count = delete_files_in_directory(RESULTS_DIR, "*.json")
-    print(f"  ✓ Deleted {csv_count} CSV and {json_count} JSON file(s)")
+    db_failed = False
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {
+            executor.submit(clear_database_tables): 'database',
+            executor.submit(wipe_directory, VECTORS_DIR): 'vectors',
+            executor.submit(wipe_directory, RESULTS_DIR): 'results',
+        }
+        
+        for future in as_completed(futures):
+            step = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                if step == 'database':
+                    print(f"  ❌ Error clearing database: {e}")
+                    db_failed = True
+                else:
+                    print(f"  ❌ Error deleting {step} files: {e}")
+                continue
+            
+            if step == 'database':
+                print("  ✓ Database tables cleared")
+            elif step == 'vectors':
+                print(f"  ✓ Deleted {result} embedding file(s)")
+            else:
+                print(f"  ✓ Deleted {result} result file(s)")
+    
+    if db_failed:
+        return
     
-    # 4. Show current state
-    print("\n" + "="*70)
-    print("  RESET COMPLETE")
-    print("="*70)
+    # Show current state
+    print(COMPLETE_BANNER)
     
     counts = get_job_count()
-    print(f"\nCurrent state:")
-    print(f"  Raw jobs: {counts['total']}")
-    print(f"  Processed: {counts['processed']}")
-    print(f"  Unprocessed: {counts['unprocessed']}")
-    
-    print("\n✓ Ready for fresh preprocessing!")
-    print("\nNext steps:")
-    print("  Option 1 (Full pipeline): python -m src.pipeline --skip-ingestion")
-    print("  Option 2 (Step-by-step):")
-    print("    1. python -m src.preprocess")
-    print("    2. python -m src.vectorize")
-    print("    3. python -m src.rank")
+    print(
+        f"\nCurrent state:\n"
+        f"  Raw jobs: {counts['total']}\n"
+        f"  Processed: {counts['processed']}\n"
+        f"  Unprocessed: {counts['unprocessed']}"
+    )
+    
+    print(NEXT_STEPS)
 
 
 if __name__ == "__main__":
@@ -4,11 +4,23 @@ All file paths, database settings, and model configs defined here.
 """
 
 import os
+import re
+import math
+import functools
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Optional: Aho-Corasick automata for multi-keyword matching
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Load environment variables from .env file (once per process; the values
+# land in os.environ, so re-imports and child processes can skip the parse)
+if not os.environ.get('_DOTENV_LOADED'):
+    load_dotenv()
+    os.environ['_DOTENV_LOADED'] = '1'
 
 # =============================================
 # PROJECT PATHS
@@ -25,21 +37,34 @@ VECTORS_DIR = DATA_DIR / 'vectors'
 RESULTS_DIR = DATA_DIR / 'results'
 RESUME_DIR = DATA_DIR / 'resume'
 
-# Ensure all directories exist
+# Parquet copy of staging.job_postings_clean with JSON columns decoded
+# (written by db_utils.refresh_clean_cache)
+CLEAN_JOBS_CACHE = PROCESSED_DATA_DIR / 'jobs_clean.parquet'
+
+# Ensure all directories exist (is_dir() first: a stat is cheaper than mkdir)
 for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, VECTORS_DIR, RESULTS_DIR, RESUME_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+    if not directory.is_dir():
+        directory.mkdir(parents=True, exist_ok=True)
 
 # =============================================
 # DATABASE CONFIGURATION
 # =============================================
 
-DB_CONFIG = {
-    'server': os.getenv('DB_SERVER', 'localhost'),
-    'database': os.getenv('DB_DATABASE', 'JobMatchPipeline'),
-    'driver': os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server'),
-    'username': os.getenv('DB_USERNAME'),  # Optional, for SQL Auth
-    'password': os.getenv('DB_PASSWORD'),  # Optional, for SQL Auth
-}
+def _read_db_config() -> dict:
+    """Read database settings from environment variables."""
+    return {
+        'server': os.getenv('DB_SERVER', 'localhost'),
+        'database': os.getenv('DB_DATABASE', 'JobMatchPipeline'),
+        'driver': os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server'),
+        'username': os.getenv('DB_USERNAME'),  # Optional, for SQL Auth
+        'password': os.getenv('DB_PASSWORD'),  # Optional, for SQL Auth
+    }
+
+
+DB_CONFIG = _read_db_config()
+
+# Maximum number of idle connections kept open per connection string
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
 
 # =============================================
 # NLP MODEL CONFIGURATION
@@ -48,9 +73,61 @@ DB_CONFIG = {
 # spaCy model for NLP tasks (NER, POS tagging, etc.)
 SPACY_MODEL = 'en_core_web_sm'
 
+# Components left out when the model loads. Nothing reads dependency labels,
+# and the parser is the slowest stage of the small English pipeline.
+SPACY_EXCLUDE = ('parser',)
+
+# Documents per nlp.pipe() batch and worker processes (-1 = all cores).
+# Windows starts workers with spawn, which reloads the model in every
+# process, so multiprocessing there is opt-in via SPACY_N_PROCESS.
+SPACY_BATCH_SIZE = 64
+SPACY_N_PROCESS = int(os.getenv(
+    'SPACY_N_PROCESS', '1' if os.name == 'nt' else str(max(1, (os.cpu_count() or 1) - 1))
+))
+
 # HuggingFace sentence transformer for embeddings
 EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
 
+# Texts per model.encode() forward pass
+EMBEDDING_BATCH_SIZE = 64
+
+# Job texts encoded and written to parquet per chunk (bounds embedding memory)
+EMBEDDING_STREAM_ROWS = int(os.getenv('EMBEDDING_STREAM_ROWS', '4096'))
+
+# Device for the embedding model: 'auto' uses CUDA when available, else CPU
+# (or name one explicitly, e.g. 'cpu', 'cuda:1', 'mps')
+EMBEDDING_DEVICE = os.getenv('EMBEDDING_DEVICE', 'auto')
+
+# Inference backend: 'torch', or 'onnx' for ONNX Runtime (faster on CPU;
+# needs sentence-transformers>=3.2 and optimum[onnxruntime], falls back to
+# torch otherwise). EMBEDDING_ONNX_FILE picks an exported variant from the
+# model repo, e.g. 'onnx/model_qint8_avx512_vnni.onnx' for int8 weights.
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch').lower()
+EMBEDDING_ONNX_FILE = os.getenv('EMBEDDING_ONNX_FILE')
+
+# PyTorch intra-op threads for encoding on CPU (default: one per core)
+EMBEDDING_CPU_THREADS = int(os.getenv('EMBEDDING_CPU_THREADS', str(os.cpu_count() or 1)))
+
+# Run the model in half precision on CUDA, where fp16 uses the tensor
+# cores (ignored on CPU, where fp16 is slower than fp32)
+EMBEDDING_FP16 = os.getenv('EMBEDDING_FP16', '1') == '1'
+
+# Embeddings of previously seen texts, keyed by model (name, backend and
+# ONNX file) and SHA-256 of the text, so re-runs only encode new or edited text
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE', '1') == '1'
+EMBEDDING_CACHE_FILE = VECTORS_DIR / 'embed_cache.parquet'
+
+# Precision embeddings are stored at on disk in parquet ('float16' halves
+# the file; 'int8' quarters it, with one float32 scale per row; 'float32'
+# keeps full precision). Scoring always runs in float32.
+EMBEDDING_STORE_DTYPE = os.getenv('EMBEDDING_STORE_DTYPE', 'float16')
+
+# A float32 .arrow copy next to the parquet is memory-mapped for scoring
+# instead of decoding it. It would also bypass a smaller store dtype, so
+# it is only written (and read) when EMBEDDING_STORE_DTYPE is 'float32';
+# otherwise ranking reads the parquet.
+EMBEDDING_ARROW_SIBLING = EMBEDDING_STORE_DTYPE == 'float32'
+
 # =============================================
 # RESUME CONFIGURATION
 # =============================================
@@ -86,6 +163,31 @@ TOP_N_CONFIG = {
     'Certifications': 1,
 }
 
+# =============================================
+# INGESTION CONFIGURATION
+# =============================================
+
+# Number of job postings sent to the database per bulk insert
+INGEST_BATCH_SIZE = 1000
+
+# JSON files at least this large are streamed record by record (needs ijson)
+JSON_STREAM_MIN_BYTES = 50 * 1024 * 1024
+
+# Worker processes that parse/normalize JSON files in parallel (1 = serial)
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', str(os.cpu_count() or 1)))
+
+# Worker processes are only started when the files add up to at least this
+# many bytes; below it, spawning them and re-importing the modules costs
+# more than the parsing they would share
+INGEST_PARALLEL_MIN_BYTES = int(os.getenv('INGEST_PARALLEL_MIN_BYTES', str(32 * 1024 * 1024)))
+
+# Client-side duplicate filter sizing (a Bloom filter when rbloom is installed)
+INGEST_DEDUP_EXPECTED_ITEMS = 1_000_000
+INGEST_DEDUP_ERROR_RATE = 1e-6
+
+# Level for per-file/per-record ingestion logging (DEBUG shows per-record warnings)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
 # =============================================
 # DEDUPLICATION CONFIGURATION
 # =============================================
@@ -150,13 +252,121 @@ SOFT_SKILLS = [
     'interpersonal', 'presentation', 'written', 'verbal'
 ]
 
+# Technology keywords looked for in job postings and the resume
+TECH_KEYWORDS = [
+    'python', 'sql', 'r', 'java', 'javascript', 'c#', 'c++',
+    'power bi', 'tableau', 'excel', 'looker', 'qlik',
+    'azure', 'aws', 'gcp', 'cloud',
+    'spark', 'hadoop', 'kafka', 'airflow',
+    'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch',
+    'git', 'docker', 'kubernetes',
+    'etl', 'elt', 'api', 'rest',
+    'machine learning', 'deep learning', 'nlp', 'ai',
+    'statistics', 'mathematics', 'modeling'
+]
+
+
+def build_keyword_automaton(keyword_map):
+    """
+    Compile a {category: [phrases]} mapping into one Aho-Corasick automaton.
+    
+    Each lowercased phrase maps to (phrase, categories), since a phrase
+    can belong to several categories (e.g. 'must have').
+    
+    Args:
+        keyword_map: Dict of category -> list of phrases
+        
+    Returns:
+        ahocorasick.Automaton, or None if pyahocorasick is not installed
+    """
+    if ahocorasick is None:
+        return None
+    
+    phrase_categories = {}
+    for category, phrases in keyword_map.items():
+        for phrase in phrases:
+            phrase_categories.setdefault(phrase.lower(), []).append(category)
+    
+    automaton = ahocorasick.Automaton()
+    for phrase, categories in phrase_categories.items():
+        automaton.add_word(phrase, (phrase, tuple(categories)))
+    automaton.make_automaton()
+    
+    return automaton
+
+
+# Single-pass technology keyword scan (None without pyahocorasick)
+_TECH_KEYWORD_AUTOMATON = build_keyword_automaton({'skill': TECH_KEYWORDS})
+
+# Characters that may not touch a whole-word keyword match ('r' must not
+# match inside "professional"; 'c#' and 'scikit-learn' still match)
+_WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+
+# Whole-word fallback for iter_tech_keywords (longest keywords first)
+_RE_TECH_KEYWORD = re.compile(
+    r'(?<![a-z0-9])(?:'
+    + '|'.join(re.escape(keyword) for keyword in sorted(TECH_KEYWORDS, key=len, reverse=True))
+    + r')(?![a-z0-9])',
+    re.IGNORECASE
+)
+
+
+def iter_tech_keywords(text):
+    """
+    Yield each whole-word TECH_KEYWORDS match in text.
+    
+    A match must not have a letter or digit directly before or after it,
+    so short keywords ('r', 'ai', 'git') are not found inside ordinary
+    words ("professional", "maintain", "digital"). Matching ignores case.
+    Lives here rather than in src.preprocess so the ranker can use it
+    without importing spaCy.
+    
+    Args:
+        text: Text to scan
+        
+    Returns:
+        Iterator of (keyword in its TECH_KEYWORDS form, start, end) with
+        text[start:end] the matched text
+    """
+    text_lower = text.lower()
+    
+    # Regex over the original text when lowercasing shifts offsets
+    if _TECH_KEYWORD_AUTOMATON is None or len(text_lower) != len(text):
+        for match in _RE_TECH_KEYWORD.finditer(text):
+            yield match.group().lower(), match.start(), match.end()
+        return
+    
+    for end, (keyword, _) in _TECH_KEYWORD_AUTOMATON.iter(text_lower):
+        start = end - len(keyword) + 1
+        if start > 0 and text_lower[start - 1] in _WORD_CHARS:
+            continue
+        if end + 1 < len(text_lower) and text_lower[end + 1] in _WORD_CHARS:
+            continue
+        yield keyword, start, end + 1
+
+
+def find_tech_keywords(text):
+    """
+    Find which TECH_KEYWORDS occur in text as whole words (see iter_tech_keywords).
+    
+    Args:
+        text: Text to scan
+        
+    Returns:
+        Sorted list of matching keywords (in their TECH_KEYWORDS form)
+    """
+    return sorted({keyword for keyword, _, _ in iter_tech_keywords(text)})
+
+
 # =============================================
 # UTILITY FUNCTIONS
 # =============================================
 
+@functools.lru_cache(maxsize=1)
 def get_db_connection_string():
     """
     Build database connection string based on authentication type.
+    Cached, since DB_CONFIG only changes through reload_config().
     
     Returns:
         str: pyodbc connection string
@@ -188,6 +398,16 @@ def get_db_connection_string():
     return conn_str
 
 
+def reload_config() -> None:
+    """
+    Re-read database settings from the environment and clear the cached
+    connection string (e.g. after changing env vars in tests).
+    """
+    DB_CONFIG.clear()
+    DB_CONFIG.update(_read_db_config())
+    get_db_connection_string.cache_clear()
+
+
 def validate_config():
     """
     Validate that all critical configuration is present.
@@ -199,9 +419,10 @@ def validate_config():
     if not RESUME_FILE.exists():
         raise ValueError(f"Resume file not found: {RESUME_FILE}")
     
-    # Check score weights sum to 1.0
-    weight_sum = sum(SCORE_WEIGHTS.values())
-    if not (0.99 <= weight_sum <= 1.01):  # Allow small floating point errors
+    # Check score weights sum to 1.0 (fsum is exact, so only representation
+    # error needs tolerating)
+    weight_sum = math.fsum(SCORE_WEIGHTS.values())
+    if not math.isclose(weight_sum, 1.0, abs_tol=1e-9):
         raise ValueError(f"SCORE_WEIGHTS must sum to 1.0, got {weight_sum}")
     
     print("✓ Configuration validated successfully")
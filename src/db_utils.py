@@ -5,14 +5,104 @@ Handles connections, queries, inserts, and common database operations.
 
 import pyodbc
 import pandas as pd
-from typing import Optional, List, Dict, Any, Tuple
-import json
-from src.config import get_db_connection_string
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Union
+from contextlib import contextmanager
+import orjson
+import queue
+import functools
+import threading
+from collections import namedtuple
+from src.config import get_db_connection_string, DB_POOL_SIZE, CLEAN_JOBS_CACHE
+
+# Optional: turbodbc fetches result sets straight into Arrow columns
+try:
+    import turbodbc
+    from turbodbc import make_options, Megabytes
+except ImportError:
+    turbodbc = None
+
+# Keep the ODBC driver manager's own pooling on; must be set before the
+# first connect() call to take effect.
+pyodbc.pooling = True
+
+
+# =============================================
+# Connection Pooling
+# =============================================
+
+class _ConnPool:
+    """
+    Fixed-size pool of live pyodbc connections for a single connection string.
+    
+    Connections are created lazily on demand and handed back with put()
+    instead of being closed, so repeated helper calls skip the
+    TCP/TLS/login handshake.
+    """
+    
+    def __init__(self, conn_str: str, size: int):
+        self.conn_str = conn_str
+        self._idle = queue.Queue(maxsize=size)
+    
+    def get(self) -> pyodbc.Connection:
+        """Return an idle connection, or open a new one if none are idle."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return pyodbc.connect(self.conn_str)
+            
+            # Drop connections that were closed while sitting in the pool
+            if not conn.closed:
+                return conn
+    
+    def put(self, conn: pyodbc.Connection) -> None:
+        """Return a connection to the pool, closing it if the pool is full."""
+        if conn.closed:
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def close_all(self) -> None:
+        """Close every idle connection held by the pool."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+
+
+# One pool per connection string
+_pools: Dict[str, _ConnPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool() -> _ConnPool:
+    """Get (or create) the pool for the configured connection string."""
+    conn_str = get_db_connection_string()
+    
+    with _pools_lock:
+        pool = _pools.get(conn_str)
+        if pool is None:
+            pool = _ConnPool(conn_str, DB_POOL_SIZE)
+            _pools[conn_str] = pool
+    
+    return pool
 
 
 def get_connection() -> pyodbc.Connection:
     """
-    Create and return a database connection.
+    Get a database connection from the connection pool.
+    
+    Callers must hand the connection back with release_connection()
+    rather than closing it.
     
     Returns:
         pyodbc.Connection: Active database connection
@@ -21,14 +111,106 @@ def get_connection() -> pyodbc.Connection:
         pyodbc.Error: If connection fails
     """
     try:
-        conn_str = get_db_connection_string()
-        conn = pyodbc.connect(conn_str)
-        return conn
+        return _get_pool().get()
     except pyodbc.Error as e:
         print(f"❌ Database connection failed: {e}")
         raise
 
 
+def release_connection(conn: pyodbc.Connection) -> None:
+    """
+    Return a connection obtained from get_connection() to the pool.
+    
+    Args:
+        conn: Connection to release
+    """
+    _get_pool().put(conn)
+
+
+def close_all_pools() -> None:
+    """
+    Close all pooled connections (call on shutdown).
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    
+    for pool in pools:
+        pool.close_all()
+
+
+@contextmanager
+def managed_cursor(commit: bool = False, action: str = "Query execution") -> Iterator[Tuple[pyodbc.Connection, pyodbc.Cursor]]:
+    """
+    Context manager yielding a pooled connection and a fresh cursor.
+    
+    Commits on success if requested, rolls back on any exception, and
+    always closes the cursor. The connection goes back to the pool,
+    except after a database error: it may be dead (server restart,
+    dropped session), so it is closed instead of being handed to the
+    next caller.
+    
+    Args:
+        commit: Commit the transaction when the block exits cleanly
+        action: Description used in the error message on failure
+        
+    Example:
+        with managed_cursor(commit=True) as (conn, cursor):
+            cursor.execute("UPDATE staging.raw_jobs SET is_processed = 0")
+    """
+    conn = get_connection()
+    cursor = None
+    broken = False
+    
+    try:
+        cursor = conn.cursor()
+        yield conn, cursor
+        if commit:
+            conn.commit()
+            
+    except pyodbc.Error as e:
+        print(f"❌ {action} failed: {e}")
+        broken = True
+        _safe_rollback(conn)
+        raise
+        
+    except Exception as e:
+        # pandas.read_sql (pandas 2.x) re-raises driver errors as its own
+        # DatabaseError; otherwise the connection should still be usable
+        broken = isinstance(e.__cause__, pyodbc.Error)
+        broken = not _safe_rollback(conn) or broken
+        raise
+        
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except pyodbc.Error:
+                broken = True
+        
+        if broken:
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+        else:
+            release_connection(conn)
+
+
+def _safe_rollback(conn: pyodbc.Connection) -> bool:
+    """
+    Roll back without letting a failure mask the error being handled.
+    
+    Returns:
+        True if the rollback succeeded
+    """
+    try:
+        conn.rollback()
+        return True
+    except pyodbc.Error:
+        return False
+
+
 def execute_query(query: str, params: Optional[Tuple] = None, fetch: bool = True) -> Optional[List[Tuple]]:
     """
     Execute a SELECT query and return results.
@@ -44,46 +226,64 @@ def execute_query(query: str, params: Optional[Tuple] = None, fetch: bool = True
     Example:
         rows = execute_query("SELECT * FROM staging.raw_jobs WHERE company = ?", ("Google",))
     """
-    conn = None
-    cursor = None
+    try:
+        with managed_cursor(commit=not fetch) as (conn, cursor):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            if fetch:
+                return cursor.fetchall()
+            return None
+            
+    except pyodbc.Error:
+        print(f"Query: {query}")
+        raise
+
+
+def _read_sql_arrow(query: str, params: Optional[Tuple] = None) -> pd.DataFrame:
+    """
+    Run a SELECT through turbodbc and build the DataFrame from Arrow buffers.
+    
+    Args:
+        query: SQL query string
+        params: Optional tuple of parameters for parameterized queries
+        
+    Returns:
+        pandas DataFrame with query results
+    """
+    conn = turbodbc.connect(
+        connection_string=get_db_connection_string(),
+        turbodbc_options=make_options(read_buffer_size=Megabytes(50))
+    )
     
     try:
-        conn = get_connection()
         cursor = conn.cursor()
-        
         if params:
-            cursor.execute(query, params)
+            cursor.execute(query, list(params))
         else:
             cursor.execute(query)
         
-        if fetch:
-            results = cursor.fetchall()
-            return results
-        else:
-            conn.commit()
-            return None
-            
-    except pyodbc.Error as e:
-        print(f"❌ Query execution failed: {e}")
-        print(f"Query: {query}")
-        if conn:
-            conn.rollback()
-        raise
+        table = cursor.fetchallarrow()
+        cursor.close()
+        return table.to_pandas(self_destruct=True)
         
     finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        conn.close()
 
 
-def execute_query_df(query: str, params: Optional[Tuple] = None) -> pd.DataFrame:
+def execute_query_df(query: str, params: Optional[Tuple] = None,
+                     use_arrow: bool = False) -> pd.DataFrame:
     """
     Execute a SELECT query and return results as a pandas DataFrame.
     
     Args:
         query: SQL query string
         params: Optional tuple of parameters for parameterized queries
+        use_arrow: Fetch via turbodbc into Arrow columns (faster for wide/large
+            result sets). Falls back to pandas.read_sql if turbodbc is not
+            installed.
         
     Returns:
         pandas DataFrame with query results
@@ -91,34 +291,139 @@ def execute_query_df(query: str, params: Optional[Tuple] = None) -> pd.DataFrame
     Example:
         df = execute_query_df("SELECT * FROM staging.raw_jobs")
     """
-    conn = None
+    if use_arrow and turbodbc is not None:
+        try:
+            return _read_sql_arrow(query, params)
+        except Exception as e:
+            print(f"❌ Query execution failed: {e}")
+            print(f"Query: {query}")
+            raise
     
     try:
-        conn = get_connection()
-        
-        if params:
-            df = pd.read_sql(query, conn, params=params)
-        else:
-            df = pd.read_sql(query, conn)
+        # managed_cursor closes the connection after a database error
+        # instead of returning it to the pool
+        with managed_cursor(action="Query execution") as (conn, _):
+            if params:
+                df = pd.read_sql(query, conn, params=params)
+            else:
+                df = pd.read_sql(query, conn)
         
         return df
         
+    except pyodbc.Error:
+        print(f"Query: {query}")
+        raise
+        
     except Exception as e:
         print(f"❌ Query execution failed: {e}")
         print(f"Query: {query}")
         raise
-        
-    finally:
-        if conn:
-            conn.close()
 
 
-def insert_job_posting(job_data: Dict[str, Any]) -> Optional[int]:
+# One staging.raw_jobs row, fields in insert column order; being a tuple,
+# it is passed to cursor.execute/executemany as-is
+JobPosting = namedtuple('JobPosting', [
+    'job_title', 'company', 'location', 'job_description', 'job_url',
+    'date_posted', 'salary_range', 'job_type', 'source'
+])
+
+_RAW_JOB_COLUMNS = ", ".join(JobPosting._fields)
+
+_CLEAN_JOB_COLUMNS = (
+    "job_id, job_title_clean, company, location, description_clean, "
+    "qualifications_required, qualifications_bonus, responsibilities, summary, "
+    "extracted_skills, entities, action_verbs, domain_tags, "
+    "job_url, date_posted"
+)
+
+
+def _job_posting_row(job_data: Union[JobPosting, Dict[str, Any]]) -> JobPosting:
+    """Build a staging.raw_jobs parameter tuple in _RAW_JOB_COLUMNS order."""
+    if isinstance(job_data, JobPosting):
+        return job_data
+    
+    return JobPosting(
+        job_data.get('job_title'),
+        job_data.get('company'),
+        job_data.get('location'),
+        job_data.get('job_description'),
+        job_data.get('job_url'),
+        job_data.get('date_posted'),
+        job_data.get('salary_range'),
+        job_data.get('job_type'),
+        job_data.get('source', 'manual')
+    )
+
+
+def _dump_json(value: Any) -> str:
+    """Serialize a list/dict to a JSON string for an NVARCHAR column."""
+    return orjson.dumps(value).decode()
+
+
+def _cleaned_job_row(job_id: int, cleaned_data: Dict[str, Any]) -> Tuple:
+    """
+    Build a staging.job_postings_clean parameter tuple in _CLEAN_JOB_COLUMNS
+    order, converting lists/dicts to JSON strings.
+    """
+    return (
+        job_id,
+        cleaned_data.get('job_title_clean'),
+        cleaned_data.get('company'),
+        cleaned_data.get('location'),
+        cleaned_data.get('description_clean'),
+        _dump_json(cleaned_data.get('qualifications_required', [])),
+        _dump_json(cleaned_data.get('qualifications_bonus', [])),
+        _dump_json(cleaned_data.get('responsibilities', [])),
+        cleaned_data.get('summary'),
+        _dump_json(cleaned_data.get('extracted_skills', [])),
+        _dump_json(cleaned_data.get('entities', {})),
+        _dump_json(cleaned_data.get('action_verbs', [])),
+        _dump_json(cleaned_data.get('domain_tags', [])),
+        cleaned_data.get('job_url'),
+        cleaned_data.get('date_posted')
+    )
+
+
+def _merge_job_posting(cursor: pyodbc.Cursor, job: JobPosting) -> Optional[int]:
+    """Insert one job on an open cursor; returns its job_id, or None if duplicate."""
+    # Insert unless a job with the same (company, job_title, date_posted)
+    # exists; OUTPUT returns the new job_id, or no row for a duplicate
+    merge_query = f"""
+        MERGE staging.raw_jobs WITH (HOLDLOCK) AS tgt
+        USING (VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)) AS src ({_RAW_JOB_COLUMNS})
+        ON tgt.company = src.company
+           AND tgt.job_title = src.job_title
+           AND tgt.date_posted = src.date_posted
+        WHEN NOT MATCHED THEN
+            INSERT ({_RAW_JOB_COLUMNS})
+            VALUES (src.job_title, src.company, src.location, src.job_description, src.job_url,
+                    src.date_posted, src.salary_range, src.job_type, src.source)
+        OUTPUT inserted.job_id;
+    """
+    
+    cursor.execute(merge_query, job)
+    row = cursor.fetchone()
+    
+    if row is None:
+        print(f"⚠️  Duplicate job found: {job.company} - {job.job_title}")
+        return None
+    
+    job_id = row[0]
+    
+    print(f"✓ Inserted job_id {job_id}: {job.company} - {job.job_title}")
+    
+    return int(job_id)
+
+
+def insert_job_posting(job_data: Union[JobPosting, Dict[str, Any]],
+                       cursor: Optional[pyodbc.Cursor] = None) -> Optional[int]:
     """
     Insert a job posting into staging.raw_jobs.
     
     Args:
-        job_data: Dictionary with job posting fields
+        job_data: JobPosting, or dictionary with job posting fields
+        cursor: Optional open cursor; the insert then joins the caller's
+            transaction and is not committed here
         
     Returns:
         job_id of inserted record, or None if duplicate
@@ -134,70 +439,13 @@ def insert_job_posting(job_data: Dict[str, Any]) -> Optional[int]:
         - job_type (optional)
         - source (optional, defaults to 'manual')
     """
-    conn = None
-    cursor = None
+    job = _job_posting_row(job_data)
     
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Check for duplicate based on (company, job_title, date_posted)
-        check_query = """
-            SELECT job_id FROM staging.raw_jobs 
-            WHERE company = ? AND job_title = ? AND date_posted = ?
-        """
-        cursor.execute(check_query, (
-            job_data.get('company'),
-            job_data.get('job_title'),
-            job_data.get('date_posted')
-        ))
-        
-        existing = cursor.fetchone()
-        if existing:
-            print(f"⚠️  Duplicate job found: {job_data.get('company')} - {job_data.get('job_title')}")
-            return None
-        
-        # Insert new job
-        insert_query = """
-            INSERT INTO staging.raw_jobs (
-                job_title, company, location, job_description, job_url,
-                date_posted, salary_range, job_type, source
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        cursor.execute(insert_query, (
-            job_data.get('job_title'),
-            job_data.get('company'),
-            job_data.get('location'),
-            job_data.get('job_description'),
-            job_data.get('job_url'),
-            job_data.get('date_posted'),
-            job_data.get('salary_range'),
-            job_data.get('job_type'),
-            job_data.get('source', 'manual')
-        ))
-        
-        # Get the inserted job_id
-        cursor.execute("SELECT @@IDENTITY")
-        job_id = cursor.fetchone()[0]
-        
-        conn.commit()
-        print(f"✓ Inserted job_id {job_id}: {job_data.get('company')} - {job_data.get('job_title')}")
-        
-        return int(job_id)
-        
-    except pyodbc.Error as e:
-        print(f"❌ Insert failed: {e}")
-        if conn:
-            conn.rollback()
-        raise
-        
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    if cursor is not None:
+        return _merge_job_posting(cursor, job)
+    
+    with managed_cursor(commit=True, action="Insert") as (conn, cursor):
+        return _merge_job_posting(cursor, job)
 
 
 def insert_cleaned_job(job_id: int, cleaned_data: Dict[str, Any]) -> bool:
@@ -227,63 +475,217 @@ def insert_cleaned_job(job_id: int, cleaned_data: Dict[str, Any]) -> bool:
         - job_url
         - date_posted
     """
-    conn = None
-    cursor = None
-    
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
+    with managed_cursor(commit=True, action="Insert cleaned job") as (conn, cursor):
         # Check if already exists
         cursor.execute("SELECT job_id FROM staging.job_postings_clean WHERE job_id = ?", (job_id,))
         if cursor.fetchone():
             print(f"⚠️  Cleaned job already exists for job_id {job_id}, skipping")
             return False
         
-        insert_query = """
-            INSERT INTO staging.job_postings_clean (
-                job_id, job_title_clean, company, location, description_clean,
-                qualifications_required, qualifications_bonus, responsibilities, summary,
-                extracted_skills, entities, action_verbs, domain_tags,
-                job_url, date_posted
-            )
+        insert_query = f"""
+            INSERT INTO staging.job_postings_clean ({_CLEAN_JOB_COLUMNS})
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
-        # Convert lists/dicts to JSON strings
-        cursor.execute(insert_query, (
-            job_id,
-            cleaned_data.get('job_title_clean'),
-            cleaned_data.get('company'),
-            cleaned_data.get('location'),
-            cleaned_data.get('description_clean'),
-            json.dumps(cleaned_data.get('qualifications_required', [])),
-            json.dumps(cleaned_data.get('qualifications_bonus', [])),
-            json.dumps(cleaned_data.get('responsibilities', [])),
-            cleaned_data.get('summary'),
-            json.dumps(cleaned_data.get('extracted_skills', [])),
-            json.dumps(cleaned_data.get('entities', {})),
-            json.dumps(cleaned_data.get('action_verbs', [])),
-            json.dumps(cleaned_data.get('domain_tags', [])),
-            cleaned_data.get('job_url'),
-            cleaned_data.get('date_posted')
-        ))
-        
-        conn.commit()
+        cursor.execute(insert_query, _cleaned_job_row(job_id, cleaned_data))
+        invalidate_clean_cache()
+        
         print(f"✓ Inserted cleaned data for job_id {job_id}")
         return True
+
+
+def _bulk_insert_job_postings(cursor: pyodbc.Cursor, rows: List[JobPosting], total: int) -> List[int]:
+    """Stage rows through #tmp_raw_jobs on an open cursor; returns the new job_ids."""
+    cursor.fast_executemany = True
+    
+    cursor.execute("""
+        IF OBJECT_ID('tempdb..#tmp_raw_jobs') IS NOT NULL DROP TABLE #tmp_raw_jobs;
+        CREATE TABLE #tmp_raw_jobs (
+            job_title NVARCHAR(500),
+            company NVARCHAR(500),
+            location NVARCHAR(500),
+            job_description NVARCHAR(MAX),
+            job_url NVARCHAR(1000),
+            date_posted DATE,
+            salary_range NVARCHAR(200),
+            job_type NVARCHAR(100),
+            source NVARCHAR(100)
+        );
+    """)
+    
+    cursor.executemany(
+        f"INSERT INTO #tmp_raw_jobs ({_RAW_JOB_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    
+    cursor.execute(f"""
+        INSERT INTO staging.raw_jobs ({_RAW_JOB_COLUMNS})
+        OUTPUT inserted.job_id
+        SELECT {_RAW_JOB_COLUMNS}
+        FROM #tmp_raw_jobs t
+        WHERE NOT EXISTS (
+            SELECT 1 FROM staging.raw_jobs r
+            WHERE r.company = t.company
+              AND r.job_title = t.job_title
+              AND r.date_posted = t.date_posted
+        )
+    """)
+    job_ids = [int(row[0]) for row in cursor.fetchall()]
+    
+    cursor.execute("DROP TABLE #tmp_raw_jobs")
+    
+    print(f"✓ Inserted {len(job_ids)} job(s), skipped {total - len(job_ids)} duplicate(s)")
+    return job_ids
+
+
+def insert_job_postings_bulk(jobs: List[Union[JobPosting, Dict[str, Any]]],
+                             cursor: Optional[pyodbc.Cursor] = None) -> List[int]:
+    """
+    Insert many job postings into staging.raw_jobs in one round-trip.
+    
+    Rows are staged into a temp table with fast_executemany, then copied
+    across with a single server-side duplicate check on
+    (company, job_title, date_posted).
+    
+    Args:
+        jobs: List of JobPosting rows or job dictionaries (same keys as insert_job_posting)
+        cursor: Optional open cursor; the insert then joins the caller's
+            transaction and is not committed here
         
-    except pyodbc.Error as e:
-        print(f"❌ Insert cleaned job failed: {e}")
-        if conn:
-            conn.rollback()
-        raise
+    Returns:
+        List of job_ids for the inserted records (duplicates are skipped)
+    """
+    if not jobs:
+        return []
+    
+    # Drop duplicates within the batch itself (unique_job would reject them)
+    rows = []
+    seen = set()
+    for job_data in jobs:
+        row = _job_posting_row(job_data)
+        key = (row.company, row.job_title, row.date_posted)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append(row)
+    
+    if cursor is not None:
+        return _bulk_insert_job_postings(cursor, rows, len(jobs))
+    
+    with managed_cursor(commit=True, action="Bulk insert") as (conn, cursor):
+        return _bulk_insert_job_postings(cursor, rows, len(jobs))
+
+
+@functools.lru_cache(maxsize=1)
+def _has_cleaned_job_tvp() -> bool:
+    """Check (once) whether dbo.SpInsertCleanedJobs from create_database.sql exists."""
+    rows = execute_query("SELECT OBJECT_ID('dbo.SpInsertCleanedJobs', 'P')")
+    return bool(rows) and rows[0][0] is not None
+
+
+def insert_cleaned_jobs_bulk(cleaned_jobs: List[Tuple[int, Dict[str, Any]]]) -> List[int]:
+    """
+    Insert many cleaned jobs into staging.job_postings_clean in one round-trip.
+    
+    Args:
+        cleaned_jobs: List of (job_id, cleaned_data) pairs (same keys as
+            insert_cleaned_job)
         
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    Returns:
+        List of job_ids that were inserted (already-cleaned jobs are skipped)
+    """
+    if not cleaned_jobs:
+        return []
+    
+    # JSON columns are serialized once per row here
+    rows = []
+    seen = set()
+    for job_id, cleaned_data in cleaned_jobs:
+        if job_id in seen:
+            continue
+        seen.add(job_id)
+        rows.append(_cleaned_job_row(job_id, cleaned_data))
+    
+    with managed_cursor(commit=True, action="Bulk insert cleaned jobs") as (conn, cursor):
+        if _has_cleaned_job_tvp():
+            # Send every row as one table-valued parameter in a single RPC;
+            # the procedure skips already-cleaned jobs and OUTPUTs new ids
+            cursor.execute("{CALL dbo.SpInsertCleanedJobs (?)}", (rows,))
+            job_ids = [int(row[0]) for row in cursor.fetchall()]
+            if job_ids:
+                invalidate_clean_cache()
+            
+            print(f"✓ Inserted cleaned data for {len(job_ids)} job(s)")
+            return job_ids
+        
+        # Databases created before the TVP type existed: stage via temp table
+        cursor.fast_executemany = True
+        
+        cursor.execute("""
+            IF OBJECT_ID('tempdb..#tmp_job_postings_clean') IS NOT NULL DROP TABLE #tmp_job_postings_clean;
+            CREATE TABLE #tmp_job_postings_clean (
+                job_id INT,
+                job_title_clean NVARCHAR(500),
+                company NVARCHAR(500),
+                location NVARCHAR(500),
+                description_clean NVARCHAR(MAX),
+                qualifications_required NVARCHAR(MAX),
+                qualifications_bonus NVARCHAR(MAX),
+                responsibilities NVARCHAR(MAX),
+                summary NVARCHAR(MAX),
+                extracted_skills NVARCHAR(MAX),
+                entities NVARCHAR(MAX),
+                action_verbs NVARCHAR(MAX),
+                domain_tags NVARCHAR(MAX),
+                job_url NVARCHAR(1000),
+                date_posted DATE
+            );
+        """)
+        
+        cursor.executemany(
+            f"INSERT INTO #tmp_job_postings_clean ({_CLEAN_JOB_COLUMNS}) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        
+        cursor.execute(f"""
+            INSERT INTO staging.job_postings_clean ({_CLEAN_JOB_COLUMNS})
+            OUTPUT inserted.job_id
+            SELECT {_CLEAN_JOB_COLUMNS}
+            FROM #tmp_job_postings_clean t
+            WHERE NOT EXISTS (
+                SELECT 1 FROM staging.job_postings_clean c
+                WHERE c.job_id = t.job_id
+            )
+        """)
+        job_ids = [int(row[0]) for row in cursor.fetchall()]
+        if job_ids:
+            invalidate_clean_cache()
+        
+        cursor.execute("DROP TABLE #tmp_job_postings_clean")
+        
+        print(f"✓ Inserted cleaned data for {len(job_ids)} job(s)")
+        return job_ids
+
+
+def ensure_indexes() -> None:
+    """
+    Create performance indexes that older databases may be missing.
+    Safe to call repeatedly; existing indexes are left alone.
+    """
+    query = """
+        IF NOT EXISTS (
+            SELECT 1 FROM sys.indexes
+            WHERE name = 'IX_raw_jobs_unprocessed'
+              AND object_id = OBJECT_ID('staging.raw_jobs')
+        )
+        CREATE INDEX IX_raw_jobs_unprocessed
+            ON staging.raw_jobs(date_ingested DESC)
+            INCLUDE (job_title, company, location, job_description, job_url,
+                     date_posted, salary_range, job_type, source)
+            WHERE is_processed = 0
+    """
+    execute_query(query, fetch=False)
 
 
 def get_unprocessed_jobs() -> pd.DataFrame:
@@ -293,12 +695,86 @@ def get_unprocessed_jobs() -> pd.DataFrame:
     Returns:
         DataFrame with unprocessed jobs
     """
+    # Only the columns preprocess_job() reads; covered by
+    # IX_raw_jobs_unprocessed (see ensure_indexes)
     query = """
-        SELECT * FROM staging.raw_jobs 
+        SELECT
+            job_id, job_title, company, location,
+            job_description, job_url, date_posted
+        FROM staging.raw_jobs
         WHERE is_processed = 0
         ORDER BY date_ingested DESC
+        OPTION (RECOMPILE)
+    """
+    return execute_query_df(query, use_arrow=True)
+
+
+# =============================================
+# Clean Job Cache
+# =============================================
+
+# JSON columns stored as list-typed parquet columns in the cache
+_CLEAN_CACHE_JSON_COLUMNS = (
+    'qualifications_required', 'qualifications_bonus',
+    'responsibilities', 'extracted_skills'
+)
+
+
+def refresh_clean_cache() -> pd.DataFrame:
+    """
+    Rebuild the parquet cache of staging.job_postings_clean.
+    
+    The JSON columns are decoded once here and written as list-typed
+    parquet columns, so readers get Python lists back without json.loads.
+    
+    Returns:
+        DataFrame of cleaned jobs, as load_clean_jobs() returns it
     """
-    return execute_query_df(query)
+    query = """
+        SELECT
+            job_id, job_title_clean, company, description_clean,
+            qualifications_required, qualifications_bonus,
+            responsibilities, summary, extracted_skills
+        FROM staging.job_postings_clean
+        ORDER BY job_id
+    """
+    df = execute_query_df(query, use_arrow=True)
+    
+    # NULL/empty JSON becomes [] (NULLs may arrive as None or NaN)
+    for column in _CLEAN_CACHE_JSON_COLUMNS:
+        df[column] = [
+            orjson.loads(value) if isinstance(value, str) and value else []
+            for value in df[column]
+        ]
+    
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), CLEAN_JOBS_CACHE)
+    print(f"✓ Cached {len(df)} cleaned job(s) to {CLEAN_JOBS_CACHE.name}")
+    
+    return df
+
+
+def load_clean_jobs(refresh: bool = False) -> pd.DataFrame:
+    """
+    Load cleaned jobs from the parquet cache, building it if missing.
+    
+    Args:
+        refresh: Rebuild the cache from the database first
+        
+    Returns:
+        DataFrame with one row per cleaned job; the JSON columns
+        (qualifications, responsibilities, extracted_skills) hold lists
+    """
+    if refresh or not CLEAN_JOBS_CACHE.exists():
+        return refresh_clean_cache()
+    
+    # to_pydict() materializes list columns as Python lists (to_pandas()
+    # would give numpy arrays)
+    return pd.DataFrame(pq.read_table(CLEAN_JOBS_CACHE).to_pydict())
+
+
+def invalidate_clean_cache() -> None:
+    """Delete the cleaned job cache so the next load rebuilds it."""
+    CLEAN_JOBS_CACHE.unlink(missing_ok=True)
 
 
 def mark_job_processed(job_id: int) -> None:
@@ -313,9 +789,40 @@ def mark_job_processed(job_id: int) -> None:
     print(f"✓ Marked job_id {job_id} as processed")
 
 
+# SQL Server accepts at most 2100 parameters per statement
+_MAX_IN_PARAMS = 2000
+
+
+def mark_jobs_processed(job_ids: List[int]) -> None:
+    """
+    Mark many jobs as processed in staging.raw_jobs.
+    
+    One UPDATE ... WHERE job_id IN (...) per _MAX_IN_PARAMS ids, all in one
+    transaction.
+    
+    Args:
+        job_ids: IDs of jobs to mark as processed
+    """
+    if not job_ids:
+        return
+    
+    with managed_cursor(commit=True, action="Mark jobs processed") as (conn, cursor):
+        for start in range(0, len(job_ids), _MAX_IN_PARAMS):
+            chunk = [int(job_id) for job_id in job_ids[start:start + _MAX_IN_PARAMS]]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(
+                f"UPDATE staging.raw_jobs SET is_processed = 1 WHERE job_id IN ({placeholders})",
+                chunk
+            )
+    
+    print(f"✓ Marked {len(job_ids)} job(s) as processed")
+
+
 def get_job_count() -> Dict[str, int]:
     """
     Get counts of jobs in different states.
+    Reads with NOLOCK: this is a status readout and should not block on
+    (or be blocked by) an in-flight ingest.
     
     Returns:
         Dictionary with counts: total, processed, unprocessed
@@ -323,9 +830,9 @@ def get_job_count() -> Dict[str, int]:
     query = """
         SELECT 
             COUNT(*) as total,
-            SUM(CASE WHEN is_processed = 1 THEN 1 ELSE 0 END) as processed,
-            SUM(CASE WHEN is_processed = 0 THEN 1 ELSE 0 END) as unprocessed
-        FROM staging.raw_jobs
+            COUNT(CASE WHEN is_processed = 1 THEN 1 END) as processed,
+            COUNT(CASE WHEN is_processed = 0 THEN 1 END) as unprocessed
+        FROM staging.raw_jobs WITH (NOLOCK)
     """
     result = execute_query(query)
     
@@ -339,36 +846,49 @@ def get_job_count() -> Dict[str, int]:
     return {'total': 0, 'processed': 0, 'unprocessed': 0}
 
 
+def iter_job_keys(batch_size: int = 10000) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Stream the (company, job_title, date_posted) keys of every raw job.
+    
+    These are the columns of the unique_job constraint; rows are fetched
+    in batches so the full key set is never held as one result list.
+    
+    Args:
+        batch_size: Rows fetched per round-trip
+        
+    Yields:
+        (company, job_title, date_posted) tuples
+    """
+    with managed_cursor(action="Job key scan") as (conn, cursor):
+        cursor.execute("""
+            SELECT company, job_title, date_posted
+            FROM staging.raw_jobs WITH (NOLOCK)
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0], row[1], row[2]
+
+
 def clear_staging_tables() -> None:
     """
     Clear all staging tables (for testing/reset).
     WARNING: This deletes all data!
     """
-    conn = None
-    cursor = None
-    
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
+    with managed_cursor(commit=True, action="Clear tables") as (conn, cursor):
+        # Must delete in order due to foreign keys. raw_jobs is referenced by
+        # foreign keys, which rules out TRUNCATE (even with the constraints
+        # disabled), so it gets a table-locked DELETE instead.
+        cursor.execute("""
+            TRUNCATE TABLE staging.job_postings_clean;
+            DELETE FROM staging.raw_jobs WITH (TABLOCK);
+        """)
         
-        # Must delete in order due to foreign keys
-        cursor.execute("DELETE FROM staging.job_postings_clean")
-        cursor.execute("DELETE FROM staging.raw_jobs")
-        
-        conn.commit()
         print("✓ Staging tables cleared")
-        
-    except pyodbc.Error as e:
-        print(f"❌ Clear tables failed: {e}")
-        if conn:
-            conn.rollback()
-        raise
-        
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    
+    invalidate_clean_cache()
 
 
 def clear_results_tables() -> None:
@@ -376,54 +896,44 @@ def clear_results_tables() -> None:
     Clear all results tables (for testing/reset).
     WARNING: This deletes all scoring data!
     """
-    conn = None
-    cursor = None
-    
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
+    with managed_cursor(commit=True, action="Clear results") as (conn, cursor):
+        # Neither table is referenced by a foreign key, so both can be
+        # truncated (minimally logged) in a single batch
+        cursor.execute("""
+            TRUNCATE TABLE results.granular_scores;
+            TRUNCATE TABLE results.job_rankings;
+        """)
         
-        cursor.execute("DELETE FROM results.granular_scores")
-        cursor.execute("DELETE FROM results.job_rankings")
-        
-        conn.commit()
         print("✓ Results tables cleared")
-        
-    except pyodbc.Error as e:
-        print(f"❌ Clear results failed: {e}")
-        if conn:
-            conn.rollback()
-        raise
-        
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
 # =============================================
 # Testing/Utility Functions
 # =============================================
 
+@functools.lru_cache(maxsize=1)
+def _server_version() -> str:
+    """Fetch @@VERSION once per process; failures raise and are not cached."""
+    with managed_cursor() as (conn, cursor):
+        cursor.execute("SELECT @@VERSION")
+        return cursor.fetchone()[0]
+
+
 def test_connection() -> bool:
     """
     Test database connection and print status.
     
+    A successful check is remembered for the rest of the process, so
+    repeated checks (e.g. pipeline prerequisites) skip the round-trip.
+    
     Returns:
         True if connection successful, False otherwise
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT @@VERSION")
-        version = cursor.fetchone()[0]
+        version = _server_version()
         
         print("✓ Database connection successful")
         print(f"  Server: {version[:50]}...")
-        
-        cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -5,13 +5,37 @@ Handles both JobSpy output format and manual JSON format.
 """
 
 import json
+import orjson
+import functools
+import hashlib
+import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Union, Tuple
+from datetime import datetime, date
 import pandas as pd
 
-from src.config import RAW_DATA_DIR
-from src.db_utils import insert_job_posting, get_job_count
+# Optional: ijson streams very large JSON arrays one record at a time
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Optional: rbloom keeps the already-ingested job filter compact on big tables
+try:
+    from rbloom import Bloom
+except ImportError:
+    Bloom = None
+
+from src.config import (
+    RAW_DATA_DIR, INGEST_BATCH_SIZE, JSON_STREAM_MIN_BYTES, LOG_LEVEL,
+    INGEST_DEDUP_EXPECTED_ITEMS, INGEST_DEDUP_ERROR_RATE, INGEST_WORKERS, INGEST_PARALLEL_MIN_BYTES
+)
+from src.db_utils import (
+    JobPosting, managed_cursor, insert_job_postings_bulk, get_job_count, iter_job_keys
+)
+
+logger = logging.getLogger(__name__)
 
 
 def load_json_file(filepath: Path) -> List[Dict[str, Any]]:
@@ -28,8 +52,7 @@ def load_json_file(filepath: Path) -> List[Dict[str, Any]]:
         ValueError: If JSON is invalid or not a list
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = orjson.loads(filepath.read_bytes())
         
         # Handle both list format and single object format
         if isinstance(data, dict):
@@ -37,18 +60,105 @@ def load_json_file(filepath: Path) -> List[Dict[str, Any]]:
         elif not isinstance(data, list):
             raise ValueError(f"JSON must be a list or dict, got {type(data)}")
         
-        print(f"✓ Loaded {len(data)} job(s) from {filepath.name}")
+        logger.info("✓ Loaded %d job(s) from %s", len(data), filepath.name)
         return data
         
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON in {filepath.name}: {e}")
+    except orjson.JSONDecodeError as e:
+        logger.error("❌ Invalid JSON in %s: %s", filepath.name, e)
         raise
     except Exception as e:
-        print(f"❌ Error reading {filepath.name}: {e}")
+        logger.error("❌ Error reading %s: %s", filepath.name, e)
         raise
 
 
-def normalize_job_data(raw_job: Dict[str, Any], source: str = 'manual') -> Dict[str, Any]:
+def iter_json_file(filepath: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the job postings in a JSON file.
+    
+    Files of at least JSON_STREAM_MIN_BYTES holding a top-level list are
+    streamed with ijson (when installed), so peak memory stays at one record
+    instead of the whole file. Everything else goes through load_json_file().
+    
+    Args:
+        filepath: Path to JSON file
+        
+    Yields:
+        Job posting dictionaries
+    """
+    if ijson is None or filepath.stat().st_size < JSON_STREAM_MIN_BYTES:
+        yield from load_json_file(filepath)
+        return
+    
+    with open(filepath, 'rb') as f:
+        # Peek at the first non-whitespace byte to tell a list from an object
+        first = f.read(64).lstrip()[:1]
+        if first != b'[':
+            yield from load_json_file(filepath)
+            return
+        
+        f.seek(0)
+        logger.info("✓ Streaming jobs from %s", filepath.name)
+        try:
+            yield from ijson.items(f, 'item', use_float=True)
+        except ijson.JSONError as e:
+            logger.error("❌ Invalid JSON in %s: %s", filepath.name, e)
+            raise
+
+
+# Schema field -> (source field names in priority order, default if none set).
+# Handles variations in field names from different sources.
+_FIELD_ALIASES = {
+    'job_title': (('job_title', 'title', 'position'), 'Unknown Title'),
+    'company': (('company', 'company_name'), 'Unknown Company'),
+    'location': (('location', 'job_location'), None),
+    'job_description': (('job_description', 'description', 'job_details'), ''),
+    'job_url': (('job_url', 'url', 'link'), None),
+    'salary_range': (('salary_range', 'salary'), None),
+    'job_type': (('job_type', 'employment_type'), None),
+}
+
+_DATE_ALIASES = ('date_posted', 'posted_date')
+
+
+def _first_value(raw_job: Dict[str, Any], keys: Tuple[str, ...], default: Any) -> Any:
+    """Return the first truthy value among keys in raw_job, else default."""
+    for key in keys:
+        value = raw_job.get(key)
+        if value:
+            return value
+    return default
+
+
+@functools.lru_cache(maxsize=4096, typed=True)
+def _parse_date(value: Union[int, float, str]) -> date:
+    """
+    Parse a date_posted value into a date.
+    Cached, since the same posting dates recur across many jobs.
+    
+    Args:
+        value: Unix timestamp in milliseconds, or ISO format string
+        
+    Returns:
+        Parsed date
+        
+    Raises:
+        ValueError, OSError: If the value cannot be parsed
+    """
+    # Check if it's a Unix timestamp (number)
+    if not isinstance(value, str):
+        # Convert milliseconds to seconds and then to date
+        return datetime.fromtimestamp(value / 1000).date()
+    
+    # Fast path for plain YYYY-MM-DD strings
+    if (len(value) == 10 and value[4] == '-' and value[7] == '-'
+            and value.isascii() and (value[:4] + value[5:7] + value[8:]).isdigit()):
+        return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+    
+    # Otherwise parse as a full ISO format string
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+
+
+def normalize_job_data(raw_job: Dict[str, Any], source: str = 'manual') -> JobPosting:
     """
     Normalize job posting data to match database schema.
     Handles variations in field names from different sources.
@@ -58,66 +168,27 @@ def normalize_job_data(raw_job: Dict[str, Any], source: str = 'manual') -> Dict[
         source: Data source ('jobspy' or 'manual')
         
     Returns:
-        Normalized job dictionary ready for database insert
+        Normalized JobPosting row ready for database insert
     """
     # Map various field name variations to our schema
     normalized = {
-        'job_title': (
-            raw_job.get('job_title') or 
-            raw_job.get('title') or 
-            raw_job.get('position') or
-            'Unknown Title'
-        ),
-        'company': (
-            raw_job.get('company') or 
-            raw_job.get('company_name') or
-            'Unknown Company'
-        ),
-        'location': (
-            raw_job.get('location') or 
-            raw_job.get('job_location') or
-            None
-        ),
-        'job_description': (
-            raw_job.get('job_description') or 
-            raw_job.get('description') or 
-            raw_job.get('job_details') or
-            ''
-        ),
-        'job_url': (
-            raw_job.get('job_url') or 
-            raw_job.get('url') or 
-            raw_job.get('link') or
-            None
-        ),
-        'salary_range': (
-            raw_job.get('salary_range') or 
-            raw_job.get('salary') or
-            None
-        ),
-        'job_type': (
-            raw_job.get('job_type') or 
-            raw_job.get('employment_type') or
-            None
-        ),
-        'source': source
+        field: _first_value(raw_job, aliases, default)
+        for field, (aliases, default) in _FIELD_ALIASES.items()
     }
+    normalized['source'] = source
     
     # Handle date_posted - try multiple formats
-    date_posted = raw_job.get('date_posted') or raw_job.get('posted_date')
+    date_posted = _first_value(raw_job, _DATE_ALIASES, None)
     if date_posted:
         try:
-            # Check if it's a Unix timestamp (number)
-            if isinstance(date_posted, (int, float)):
-                # Convert milliseconds to seconds and then to date
-                normalized['date_posted'] = datetime.fromtimestamp(date_posted / 1000).date()
-            # Try parsing as ISO format string
-            elif isinstance(date_posted, str):
-                normalized['date_posted'] = datetime.fromisoformat(date_posted.replace('Z', '+00:00')).date()
+            if isinstance(date_posted, (int, float, str)):
+                normalized['date_posted'] = _parse_date(date_posted)
             else:
                 normalized['date_posted'] = date_posted
         except (ValueError, AttributeError, OSError) as e:
-            print(f"  ⚠️  Could not parse date '{date_posted}', using today's date")
+            # Per-record: skip formatting entirely unless debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("  ⚠️  Could not parse date '%s', using today's date", date_posted)
             normalized['date_posted'] = datetime.now().date()
     else:
         # Default to today if no date provided
@@ -127,63 +198,228 @@ def normalize_job_data(raw_job: Dict[str, Any], source: str = 'manual') -> Dict[
     if not normalized['job_description']:
         raise ValueError(f"Job description is required: {raw_job.get('job_title', 'Unknown')}")
     
-    return normalized
+    # Fixed-field tuple: far smaller than a dict per row, and it is already
+    # the insert parameter tuple
+    return JobPosting(**normalized)
+
+
+def _job_key(company: Any, job_title: Any, date_posted: Any) -> bytes:
+    """Fixed-size digest of a job's unique_job key (company, job_title, date_posted)."""
+    raw = f"{company}|{job_title}|{date_posted}"
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
+
+
+def _build_seen_filter():
+    """
+    Load the keys of jobs already in staging.raw_jobs into a membership filter.
+    
+    Uses a Bloom filter when rbloom is installed, otherwise a plain set.
+    The filter only skips likely duplicates before they reach the database;
+    the duplicate check in insert_job_postings_bulk stays authoritative.
+    
+    Returns:
+        Filter supporting ``in`` and ``add``, or None if the keys could not be read
+    """
+    if Bloom is not None:
+        seen = Bloom(INGEST_DEDUP_EXPECTED_ITEMS, INGEST_DEDUP_ERROR_RATE)
+    else:
+        seen = set()
+    
+    try:
+        for company, job_title, date_posted in iter_job_keys():
+            seen.add(_job_key(company, job_title, date_posted))
+    except Exception as e:
+        logger.warning("⚠️  Could not load existing job keys, skipping client-side dedup: %s", e)
+        return None
+    
+    return seen
+
+
+def _normalize_jobs(raw_jobs: Iterable[Dict[str, Any]], source: str, filepath: Path,
+                    stats: Dict[str, int]) -> Iterator[JobPosting]:
+    """
+    Normalize raw jobs lazily, counting and skipping the ones that fail validation.
+    
+    Args:
+        raw_jobs: Raw job dictionaries from a JSON file
+        source: Data source identifier ('jobspy' or 'manual')
+        filepath: Source file (for error messages)
+        stats: Counts dict whose 'errors' entry is updated in place
+        
+    Yields:
+        Normalized JobPosting rows
+    """
+    for idx, raw_job in enumerate(raw_jobs, 1):
+        try:
+            yield normalize_job_data(raw_job, source)
+        except Exception as e:
+            logger.error("❌ Error processing job %d in %s: %s", idx, filepath.name, e)
+            stats['errors'] += 1
+
+
+def _normalize_file(filepath: Path, source: str) -> Tuple[List[JobPosting], int]:
+    """
+    Parse and normalize a whole JSON file (runs in an ingestion worker process).
+    
+    Args:
+        filepath: Path to JSON file
+        source: Data source identifier ('jobspy' or 'manual')
+        
+    Returns:
+        Tuple of (normalized jobs, number of jobs that failed validation)
+    """
+    stats = {'errors': 0}
+    jobs = list(_normalize_jobs(load_json_file(filepath), source, filepath, stats))
+    return jobs, stats['errors']
 
 
-def ingest_json_file(filepath: Path, source: str = 'manual') -> Dict[str, int]:
+def ingest_json_file(filepath: Path, source: str = 'manual', seen=None,
+                     normalized: Optional[Tuple[List[JobPosting], int]] = None) -> Dict[str, int]:
     """
     Ingest a single JSON file into the database.
     
     Args:
         filepath: Path to JSON file
         source: Data source identifier ('jobspy' or 'manual')
+        seen: Optional filter of already-ingested job keys (see _build_seen_filter);
+            jobs found in it are counted as duplicates without a database round-trip
+        normalized: Optional result of _normalize_file() for this file, computed
+            elsewhere; the file is read and normalized here if omitted
         
     Returns:
         Dictionary with counts: {'inserted': int, 'duplicates': int, 'errors': int}
     """
     stats = {'inserted': 0, 'duplicates': 0, 'errors': 0}
+    batch = []
+    file_keys = []
     
     try:
-        # Load jobs from file
-        raw_jobs = load_json_file(filepath)
+        # Normalize jobs as they are read; rows that fail validation are
+        # counted as errors and left out of the batch
+        if normalized is None:
+            jobs = _normalize_jobs(iter_json_file(filepath), source, filepath, stats)
+        else:
+            jobs, stats['errors'] = normalized
         
-        # Process each job
-        for idx, raw_job in enumerate(raw_jobs, 1):
-            try:
-                # Normalize the data
-                normalized_job = normalize_job_data(raw_job, source)
+        # One connection and one transaction for the whole file: committed
+        # once at the end, rolled back entirely if anything fails
+        with managed_cursor(commit=True, action=f"Ingest of {filepath.name}") as (conn, cursor):
+            for job in jobs:
+                # Skip jobs already ingested by an earlier run
+                if seen is not None and _job_key(job.company, job.job_title, job.date_posted) in seen:
+                    stats['duplicates'] += 1
+                    continue
                 
-                # Insert into database
-                job_id = insert_job_posting(normalized_job)
+                batch.append(job)
                 
-                if job_id:
-                    stats['inserted'] += 1
-                else:
-                    stats['duplicates'] += 1
-                    
-            except Exception as e:
-                print(f"❌ Error processing job {idx} in {filepath.name}: {e}")
-                stats['errors'] += 1
+                # Insert in batches: a constant number of round-trips per
+                # batch instead of per job
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    _insert_batch(cursor, batch, stats, file_keys)
+                    batch = []
+            
+            if batch:
+                _insert_batch(cursor, batch, stats, file_keys)
+                batch = []
         
-        print(f"\n✓ File {filepath.name} processed:")
-        print(f"  - Inserted: {stats['inserted']}")
-        print(f"  - Duplicates: {stats['duplicates']}")
-        print(f"  - Errors: {stats['errors']}")
+        # Committed: every job in the file is now in the database
+        if seen is not None:
+            for key in file_keys:
+                seen.add(key)
+        
+        logger.info("✓ File %s processed: %d inserted, %d duplicates, %d errors",
+                    filepath.name, stats['inserted'], stats['duplicates'], stats['errors'])
         
         return stats
         
     except Exception as e:
-        print(f"❌ Failed to process file {filepath.name}: {e}")
-        stats['errors'] = len(raw_jobs) if 'raw_jobs' in locals() else 1
+        logger.error("❌ Failed to process file %s: %s", filepath.name, e)
+        # The file's transaction was rolled back, so jobs counted as inserted
+        # are lost along with the ones still waiting in the batch
+        stats['errors'] += max(stats['inserted'] + len(batch), 1)
+        stats['inserted'] = 0
         return stats
 
 
-def ingest_all_json_files(source: str = 'manual') -> Dict[str, int]:
+def _insert_batch(cursor, batch: List[JobPosting], stats: Dict[str, int],
+                  file_keys: List[bytes]) -> None:
+    """
+    Bulk-insert a batch of normalized jobs inside the file's transaction.
+    
+    Args:
+        cursor: Open cursor of the file's transaction
+        batch: Normalized JobPosting rows
+        stats: Running {'inserted', 'duplicates', 'errors'} counts (updated in place)
+        file_keys: Job keys written by this file so far (extended in place)
+    """
+    job_ids = insert_job_postings_bulk(batch, cursor)
+    
+    stats['inserted'] += len(job_ids)
+    stats['duplicates'] += len(batch) - len(job_ids)
+    
+    # Inserted or not, every job in the batch is in the database once committed
+    file_keys.extend(_job_key(job.company, job.job_title, job.date_posted) for job in batch)
+
+
+def _ingest_files_parallel(json_files: List[Path], source: str,
+                           seen=None) -> Iterator[Tuple[Path, Dict[str, int]]]:
+    """
+    Normalize files across INGEST_WORKERS processes and insert them from this one.
+    
+    Results are consumed in file order, so the first file is being inserted
+    while later ones are still being parsed. Only this process talks to the
+    database. A single file, or files totalling less than
+    INGEST_PARALLEL_MIN_BYTES, are ingested serially without a pool.
+    
+    Args:
+        json_files: JSON files to ingest
+        source: Data source identifier ('jobspy' or 'manual')
+        seen: Optional already-ingested job filter (see _build_seen_filter)
+        
+    Yields:
+        (filepath, stats) for each file, in order
+    """
+    if (INGEST_WORKERS <= 1 or len(json_files) <= 1
+            or sum(filepath.stat().st_size for filepath in json_files) < INGEST_PARALLEL_MIN_BYTES):
+        for filepath in json_files:
+            yield filepath, ingest_json_file(filepath, source, seen)
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(INGEST_WORKERS, len(json_files))) as executor:
+        futures = [executor.submit(_normalize_file, filepath, source) for filepath in json_files]
+        
+        for filepath, future in zip(json_files, futures):
+            try:
+                normalized = future.result()
+            except Exception as e:
+                logger.error("❌ Failed to process file %s: %s", filepath.name, e)
+                yield filepath, {'inserted': 0, 'duplicates': 0, 'errors': 1}
+                continue
+            
+            yield filepath, ingest_json_file(filepath, source, seen, normalized)
+
+
+def find_json_files(directory: Path = RAW_DATA_DIR) -> List[Path]:
+    """
+    List the JSON files in a directory (one directory read, no glob matching).
+    
+    Args:
+        directory: Directory to scan (defaults to data/raw/)
+        
+    Returns:
+        Paths of the *.json entries in the directory
+    """
+    return [path for path in directory.iterdir() if path.suffix == '.json']
+
+
+def ingest_all_json_files(source: str = 'manual',
+                          json_files: Optional[List[Path]] = None) -> Dict[str, int]:
     """
     Ingest all JSON files from data/raw/ directory.
     
     Args:
         source: Data source identifier ('jobspy' or 'manual')
+        json_files: Files to ingest, if the directory was already scanned
         
     Returns:
         Dictionary with total counts across all files
@@ -192,7 +428,8 @@ def ingest_all_json_files(source: str = 'manual') -> Dict[str, int]:
     print()
     
     # Find all JSON files
-    json_files = list(RAW_DATA_DIR.glob('*.json'))
+    if json_files is None:
+        json_files = find_json_files()
     
     if not json_files:
         print("⚠️  No JSON files found in data/raw/")
@@ -201,11 +438,21 @@ def ingest_all_json_files(source: str = 'manual') -> Dict[str, int]:
     print(f"Found {len(json_files)} JSON file(s)")
     print()
     
-    # Process each file
+    # Process each file, sharing one filter of already-ingested jobs
     total_stats = {'inserted': 0, 'duplicates': 0, 'errors': 0}
+    seen = _build_seen_filter()
+    
+    # Very large files keep streaming in this process; the rest are parsed and
+    # normalized in worker processes while this process does all the inserts
+    large_files = [f for f in json_files if ijson is not None and f.stat().st_size >= JSON_STREAM_MIN_BYTES]
+    small_files = [f for f in json_files if f not in large_files]
+    
+    for filepath, file_stats in _ingest_files_parallel(small_files, source, seen):
+        for key in total_stats:
+            total_stats[key] += file_stats[key]
     
-    for filepath in json_files:
-        file_stats = ingest_json_file(filepath, source)
+    for filepath in large_files:
+        file_stats = ingest_json_file(filepath, source, seen)
         
         # Aggregate stats
         for key in total_stats:
@@ -316,6 +563,8 @@ Preferred:
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(level=LOG_LEVEL, format='%(message)s')
+    
     print("="*50)
     print("JOB POSTING INGESTION")
     print("="*50)
@@ -4,12 +4,14 @@ Coordinates ingestion, preprocessing, vectorization, and ranking.
 """
 
 import sys
+import logging
 from pathlib import Path
 from datetime import datetime
+from typing import List, Optional
 
-from src.config import validate_config, RAW_DATA_DIR
-from src.db_utils import get_job_count, test_connection
-from src.ingest import ingest_all_json_files
+from src.config import validate_config, RAW_DATA_DIR, LOG_LEVEL
+from src.db_utils import get_job_count, test_connection, close_all_pools
+from src.ingest import ingest_all_json_files, find_json_files
 from src.preprocess import process_all_jobs
 from src.vectorize import vectorize_all
 from src.rank import rank_jobs
@@ -22,10 +24,15 @@ def print_header(title: str) -> None:
     print("="*70)
 
 
-def check_prerequisites() -> bool:
+def check_prerequisites(skip_ingestion: bool = False,
+                        json_files: Optional[List[Path]] = None) -> bool:
     """
     Check if all prerequisites are met before running pipeline.
     
+    Args:
+        skip_ingestion: Ingestion will not run, so job files are not required
+        json_files: Job files already found in data/raw/ (scanned here if omitted)
+        
     Returns:
         True if ready to run, False otherwise
     """
@@ -45,15 +52,19 @@ def check_prerequisites() -> bool:
     except Exception as e:
         issues.append(f"Configuration error: {e}")
     
-    # 3. Check for job files
+    # 3. Check for job files (only needed when ingesting)
     print("\n3. Checking for job posting files...")
-    json_files = list(RAW_DATA_DIR.glob('*.json'))
-    if not json_files:
-        print(f"  ⚠️  No JSON files found in {RAW_DATA_DIR}")
-        print(f"  Add job posting JSON files to data/raw/ before running")
-        issues.append("No job posting files found")
+    if skip_ingestion:
+        print("  - Skipped (ingestion not requested)")
     else:
-        print(f"  ✓ Found {len(json_files)} JSON file(s)")
+        if json_files is None:
+            json_files = find_json_files()
+        if not json_files:
+            print(f"  ⚠️  No JSON files found in {RAW_DATA_DIR}")
+            print(f"  Add job posting JSON files to data/raw/ before running")
+            issues.append("No job posting files found")
+        else:
+            print(f"  ✓ Found {len(json_files)} JSON file(s)")
     
     # Print summary
     if issues:
@@ -85,8 +96,11 @@ def run_pipeline(skip_ingestion: bool = False,
     print_header("JOB MATCHING PIPELINE")
     print(f"\nStarted: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
+    # Scan data/raw/ once; the same list feeds the prerequisite check and ingestion
+    json_files = None if skip_ingestion else find_json_files()
+    
     # Check prerequisites
-    if not check_prerequisites():
+    if not check_prerequisites(skip_ingestion, json_files):
         print("\n❌ Pipeline aborted - fix prerequisites first")
         return False
     
@@ -94,7 +108,7 @@ def run_pipeline(skip_ingestion: bool = False,
         # STEP 1: INGESTION
         if not skip_ingestion:
             print_header("STEP 1/4: JOB INGESTION")
-            ingest_all_json_files(source='jobspy')
+            ingest_all_json_files(source='jobspy', json_files=json_files)
         else:
             print_header("STEP 1/4: JOB INGESTION (SKIPPED)")
             counts = get_job_count()
@@ -170,6 +184,8 @@ Pipeline Steps:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format='%(message)s')
+    
     # Parse command line arguments
     args = sys.argv[1:]
     
@@ -195,5 +211,8 @@ if __name__ == "__main__":
         skip_vectorization=skip_vectorization
     )
     
+    # Release pooled database connections
+    close_all_pools()
+    
     # Exit with appropriate code
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -5,24 +5,121 @@ Handles text cleaning, structured parsing, and NLP feature extraction.
 
 import re
 import json
-from typing import Dict, List, Any, Tuple, Optional
+import functools
+from typing import Dict, List, Any, Tuple, Optional, FrozenSet, Iterator
 from bs4 import BeautifulSoup
 import spacy
+from spacy.tokens import Doc
+
+# Optional: selectolax parses HTML in C, much faster than BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
 from collections import defaultdict
 
 from src.config import (
-    SPACY_MODEL, SECTION_HEADERS, OWNERSHIP_KEYWORDS, 
-    FREQUENCY_KEYWORDS, SOFT_SKILLS
+    SPACY_MODEL, SPACY_EXCLUDE, SPACY_BATCH_SIZE, SPACY_N_PROCESS, SECTION_HEADERS, OWNERSHIP_KEYWORDS, 
+    FREQUENCY_KEYWORDS, SOFT_SKILLS, build_keyword_automaton, iter_tech_keywords
 )
 from src.db_utils import (
-    get_unprocessed_jobs, insert_cleaned_job, 
-    mark_job_processed, get_job_count
+    get_unprocessed_jobs, insert_cleaned_jobs_bulk, 
+    mark_jobs_processed, get_job_count, ensure_indexes
 )
 
-# Load spaCy model globally (only load once)
-print("Loading spaCy model...")
-nlp = spacy.load(SPACY_MODEL)
-print(f"✓ spaCy model '{SPACY_MODEL}' loaded")
+# Precompiled regexes for text cleaning and bullet extraction
+_RE_NEWLINES = re.compile(r'\n{3,}')
+_RE_SPACES = re.compile(r' {2,}')
+
+# Block-level tags that end a line of text when HTML is stripped, so
+# "<li>SQL</li><li>Python</li>" keeps its items apart (inline tags such
+# as <b> add nothing, so words are not split)
+_BLOCK_TAGS = ('p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'table',
+               'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'header', 'footer')
+
+# Bullet line: "• - *" markers, "1. 1)" numbering, or "a. a)" lettering
+_RE_BULLET = re.compile(r'^\s*(?:[•\-\*]|\d+[\.\)]|[a-z][\.\)])\s+(.+)$')
+
+# Section header alternations, scanned over the whole text in one pass each
+_RE_QUAL_HEADER = re.compile(
+    '|'.join(map(re.escape, SECTION_HEADERS['qualifications'])), re.IGNORECASE
+)
+_RE_RESP_HEADER = re.compile(
+    '|'.join(map(re.escape, SECTION_HEADERS['responsibilities'])), re.IGNORECASE
+)
+
+# Qualification classification keywords
+BONUS_KEYWORDS = ['preferred', 'nice to have', 'bonus', 'plus', 'asset', 'ideal']
+REQUIRED_KEYWORDS = ['required', 'must have', 'must', 'essential', 'mandatory']
+
+# Domain keyword mapping for responsibility activity types
+ACTIVITY_DOMAINS = {
+    'Data Engineering': ['pipeline', 'etl', 'elt', 'ingest', 'data warehouse', 'data lake', 'spark', 'airflow'],
+    'Data Visualization': ['dashboard', 'visualization', 'power bi', 'tableau', 'report', 'visual'],
+    'Analytics': ['analysis', 'analyze', 'metric', 'kpi', 'insight', 'trend', 'statistical'],
+    'Data Science': ['machine learning', 'model', 'algorithm', 'prediction', 'ml', 'ai'],
+    'Database Management': ['database', 'sql', 'query', 'optimization', 'schema', 'index'],
+    'Data Governance': ['quality', 'governance', 'compliance', 'security', 'privacy', 'gdpr'],
+}
+
+# Domain keyword mapping for job-level domain tags (extends ACTIVITY_DOMAINS)
+DOMAIN_TAGS = {
+    'Data Engineering': ['pipeline', 'etl', 'elt', 'ingest', 'data warehouse', 'data lake', 'spark', 'airflow'],
+    'Data Visualization': ['dashboard', 'visualization', 'power bi', 'tableau', 'report', 'visual', 'bi'],
+    'Analytics': ['analysis', 'analyze', 'metric', 'kpi', 'insight', 'trend', 'statistical'],
+    'Data Science': ['machine learning', 'model', 'algorithm', 'prediction', 'ml', 'ai', 'deep learning'],
+    'Database Management': ['database', 'sql', 'query', 'optimization', 'schema', 'index', 'rdbms'],
+    'Data Governance': ['quality', 'governance', 'compliance', 'security', 'privacy', 'gdpr'],
+    'Cloud Computing': ['azure', 'aws', 'gcp', 'cloud', 'saas', 'paas', 'iaas'],
+    'Business Intelligence': ['bi', 'business intelligence', 'reporting', 'power bi', 'tableau', 'looker'],
+}
+
+# Every keyword table used by the classifiers, as group -> bucket -> phrases
+KEYWORD_GROUPS = {
+    'qualification': {'bonus': BONUS_KEYWORDS, 'required': REQUIRED_KEYWORDS},
+    'ownership': OWNERSHIP_KEYWORDS,
+    'frequency': FREQUENCY_KEYWORDS,
+    'soft_skill': {'soft': SOFT_SKILLS},
+    'activity': ACTIVITY_DOMAINS,
+    'domain': DOMAIN_TAGS,
+}
+
+# One automaton over all groups, tagged (group, bucket), so a single scan of
+# a bullet answers every classifier (None if pyahocorasick is unavailable)
+_KEYWORD_AUTOMATON = build_keyword_automaton({
+    (group, bucket): phrases
+    for group, buckets in KEYWORD_GROUPS.items()
+    for bucket, phrases in buckets.items()
+})
+
+
+@functools.lru_cache(maxsize=1)
+def get_nlp() -> spacy.language.Language:
+    """
+    Load the spaCy model on first use (only load once).
+    
+    Loading lazily keeps importing this module cheap for callers that
+    never parse text.
+    """
+    print("Loading spaCy model...")
+    nlp = spacy.load(SPACY_MODEL, exclude=list(SPACY_EXCLUDE))
+    print(f"✓ spaCy model '{SPACY_MODEL}' loaded")
+    return nlp
+
+
+# Components each extractor can do without when it parses text on its own.
+# The batch path in process_all_jobs keeps the full pipeline, since one Doc
+# there feeds every extractor; pos_ also needs attribute_ruler in v3 models.
+_NER_ONLY_DISABLE = ('tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer')
+_NO_NER_DISABLE = ('ner',)
+
+
+def _parse(text: str, disable: Tuple[str, ...]) -> Doc:
+    """Run the spaCy pipeline on text with the given components switched off."""
+    nlp = get_nlp()
+    disabled = [name for name in disable if name in nlp.pipe_names]
+    with nlp.select_pipes(disable=disabled):
+        return nlp(text)
 
 
 # =============================================
@@ -42,6 +139,23 @@ def clean_html(text: str) -> str:
     if not text:
         return ""
     
+    # Plain text (no tags or entities) has nothing to strip; skip the parse
+    if '<' not in text and '&' not in text:
+        return text
+    
+    if HTMLParser is not None:
+        tree = HTMLParser(text)
+        
+        # Remove script and style elements
+        for node in tree.css('script, style'):
+            node.decompose()
+        
+        for node in tree.css(', '.join(_BLOCK_TAGS)):
+            node.insert_after('\n')
+        
+        root = tree.body if tree.body is not None else tree.root
+        return root.text(deep=True, separator='') if root is not None else ""
+    
     # Parse HTML and extract text
     soup = BeautifulSoup(text, 'html.parser')
     
@@ -49,6 +163,9 @@ def clean_html(text: str) -> str:
     for script in soup(["script", "style"]):
         script.decompose()
     
+    for tag in soup(_BLOCK_TAGS):
+        tag.insert_after('\n')
+    
     # Get text and normalize whitespace
     text = soup.get_text()
     
@@ -69,10 +186,10 @@ def normalize_whitespace(text: str) -> str:
         return ""
     
     # Replace multiple newlines with double newline
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _RE_NEWLINES.sub('\n\n', text)
     
     # Replace multiple spaces with single space
-    text = re.sub(r' {2,}', ' ', text)
+    text = _RE_SPACES.sub(' ', text)
     
     # Remove leading/trailing whitespace from each line
     lines = [line.strip() for line in text.split('\n')]
@@ -110,43 +227,39 @@ def detect_section_boundaries(text: str) -> Dict[str, Tuple[int, int]]:
     Returns:
         Dictionary mapping section names to (start_pos, end_pos) tuples
     """
-    lines = text.split('\n')
     boundaries = {}
     
-    # Track found sections
+    # Track found sections as (name, start of the header's line)
     found_sections = []
     
-    for idx, line in enumerate(lines):
-        line_lower = line.lower().strip()
-        
-        # Skip very short lines
-        if len(line_lower) < 3:
-            continue
-        
-        # Check for qualifications section
-        if any(header in line_lower for header in SECTION_HEADERS['qualifications']):
-            if 'qualifications' not in [s[0] for s in found_sections]:
-                found_sections.append(('qualifications', idx))
-        
-        # Check for responsibilities section
-        elif any(header in line_lower for header in SECTION_HEADERS['responsibilities']):
-            if 'responsibilities' not in [s[0] for s in found_sections]:
-                found_sections.append(('responsibilities', idx))
-    
-    # Convert line indices to character positions
-    char_positions = []
-    char_count = 0
-    for line in lines:
-        char_positions.append(char_count)
-        char_count += len(line) + 1  # +1 for newline
+    # First line mentioning a qualifications header
+    match = _RE_QUAL_HEADER.search(text)
+    if match:
+        found_sections.append(('qualifications', text.rfind('\n', 0, match.start()) + 1))
+    
+    # First line mentioning a responsibilities header; a line that also
+    # mentions a qualifications header counts as qualifications only
+    pos = 0
+    while True:
+        match = _RE_RESP_HEADER.search(text, pos)
+        if not match:
+            break
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.end())
+        if line_end == -1:
+            line_end = len(text)
+        if not _RE_QUAL_HEADER.search(text, line_start, line_end):
+            found_sections.append(('responsibilities', line_start))
+            break
+        pos = line_end
+    
+    found_sections.sort(key=lambda section: section[1])
     
     # Map sections to character boundaries
-    for i, (section_name, line_idx) in enumerate(found_sections):
-        start_pos = char_positions[line_idx]
-        
+    for i, (section_name, start_pos) in enumerate(found_sections):
         # End position is start of next section, or end of text
         if i + 1 < len(found_sections):
-            end_pos = char_positions[found_sections[i + 1][1]]
+            end_pos = found_sections[i + 1][1]
         else:
             end_pos = len(text)
         
@@ -155,125 +268,181 @@ def detect_section_boundaries(text: str) -> Dict[str, Tuple[int, int]]:
     return boundaries
 
 
-def extract_bullet_points(text: str) -> List[str]:
+def _iter_lines(text: str) -> Iterator[Tuple[int, str]]:
+    """Yield (char offset, stripped line) for each non-blank line of text."""
+    offset = 0
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if line:
+            yield offset, line
+        offset += len(raw_line) + 1
+
+
+def _section_bullets(text: str, boundaries: Dict[str, Tuple[int, int]]) -> Dict[str, List[str]]:
     """
-    Extract bullet points from text section.
+    Extract the bullet points of every section in a single walk over the lines.
     
     Args:
-        text: Text containing bullet points
+        text: Cleaned job description text
+        boundaries: Section name -> (start_pos, end_pos), as returned by
+            detect_section_boundaries (sections begin at line starts)
         
     Returns:
-        List of bullet point strings
+        Dictionary mapping each section name to its list of bullet strings
     """
-    bullets = []
-    
-    # Common bullet patterns
-    bullet_patterns = [
-        r'^\s*[•\-\*]\s+(.+)$',  # • - *
-        r'^\s*\d+[\.\)]\s+(.+)$',  # 1. 1)
-        r'^\s*[a-z][\.\)]\s+(.+)$',  # a. a)
-    ]
+    bullets = {name: [] for name in boundaries}
+    starts = sorted((start, name) for name, (start, _) in boundaries.items())
     
-    lines = text.split('\n')
+    section = None
+    next_section = 0
     current_bullet = None
     
-    for line in lines:
-        line = line.strip()
-        if not line:
+    for offset, line in _iter_lines(text):
+        # Entering the next section closes the last bullet of the previous one
+        while next_section < len(starts) and offset >= starts[next_section][0]:
+            if current_bullet:
+                bullets[section].append(current_bullet.strip())
+            current_bullet = None
+            section = starts[next_section][1]
+            next_section += 1
+        
+        if section is None:
             continue
         
         # Check if line starts with bullet
-        is_bullet = False
-        for pattern in bullet_patterns:
-            match = re.match(pattern, line)
-            if match:
-                # Save previous bullet if exists
-                if current_bullet:
-                    bullets.append(current_bullet.strip())
-                # Start new bullet
-                current_bullet = match.group(1)
-                is_bullet = True
-                break
+        match = _RE_BULLET.match(line)
+        if match:
+            # Save previous bullet if exists
+            if current_bullet:
+                bullets[section].append(current_bullet.strip())
+            # Start new bullet
+            current_bullet = match.group(1)
         
         # If not a bullet start, append to current bullet (continuation)
-        if not is_bullet and current_bullet:
+        elif current_bullet:
             current_bullet += ' ' + line
     
     # Add last bullet
     if current_bullet:
-        bullets.append(current_bullet.strip())
+        bullets[section].append(current_bullet.strip())
     
     return bullets
 
 
-def classify_qualification(qual_text: str, section_context: str = '') -> str:
+def extract_bullet_points(text: str) -> List[str]:
     """
-    Classify qualification as 'required' or 'bonus'.
+    Extract bullet points from text section.
     
     Args:
-        qual_text: Qualification text
-        section_context: Surrounding text for context
+        text: Text containing bullet points
         
     Returns:
-        'required' or 'bonus'
+        List of bullet point strings
     """
-    text_lower = (qual_text + ' ' + section_context).lower()
+    return _section_bullets(text, {'text': (0, len(text))})['text']
+
+
+@functools.lru_cache(maxsize=256)
+def _keyword_hits(text_lower: str) -> Dict[str, FrozenSet[str]]:
+    """
+    Find which keyword buckets occur in text, for every keyword group.
+    
+    Cached so the classifiers run on the same bullet share one scan.
+    The returned dict is shared between callers and must not be modified.
     
-    # Check for bonus indicators
-    bonus_keywords = ['preferred', 'nice to have', 'bonus', 'plus', 'asset', 'ideal']
-    if any(keyword in text_lower for keyword in bonus_keywords):
-        return 'bonus'
+    Args:
+        text_lower: Lowercased text to scan
+        
+    Returns:
+        Dictionary mapping group name to the set of buckets with a match
+    """
+    hits = defaultdict(set)
     
-    # Check for required indicators
-    required_keywords = ['required', 'must have', 'must', 'essential', 'mandatory']
-    if any(keyword in text_lower for keyword in required_keywords):
-        return 'required'
+    if _KEYWORD_AUTOMATON is not None:
+        for _, (phrase, categories) in _KEYWORD_AUTOMATON.iter(text_lower):
+            for group, bucket in categories:
+                hits[group].add(bucket)
+    else:
+        for group, buckets in KEYWORD_GROUPS.items():
+            for bucket, phrases in buckets.items():
+                if any(phrase in text_lower for phrase in phrases):
+                    hits[group].add(bucket)
     
-    # Default to required if unclear
-    return 'required'
+    return {group: frozenset(buckets) for group, buckets in hits.items()}
 
 
-def classify_skill_type(skill_text: str) -> str:
+def _first_bucket(hits: Dict[str, FrozenSet[str]], group: str, 
+                  priority: List[str], default: str) -> str:
+    """Return the highest-priority bucket of a group that matched."""
+    matched = hits.get(group)
+    if matched:
+        for bucket in priority:
+            if bucket in matched:
+                return bucket
+    return default
+
+
+def classify_qualification(qual_lower: str, context_lower: str = '') -> str:
+    """
+    Classify qualification as 'required' or 'bonus'.
+    
+    Args:
+        qual_lower: Qualification text, already lowercased
+        context_lower: Surrounding text for context, already lowercased
+        
+    Returns:
+        'required' or 'bonus'
+    """
+    hits = _keyword_hits(qual_lower + ' ' + context_lower)
+    
+    # Bonus indicators win over required ones; default to required if unclear
+    return _first_bucket(hits, 'qualification', ['bonus', 'required'], 'required')
+
+
+def classify_skill_type(skill_lower: str) -> str:
     """
     Classify skill as 'Hard' or 'Soft'.
     
     Args:
-        skill_text: Skill description text
+        skill_lower: Skill description text, already lowercased
         
     Returns:
         'Hard' or 'Soft'
     """
-    text_lower = skill_text.lower()
-    
-    # Check for soft skill keywords
-    if any(soft_skill in text_lower for soft_skill in SOFT_SKILLS):
-        return 'Soft'
+    hits = _keyword_hits(skill_lower)
     
-    # Default to hard skill
-    return 'Hard'
+    # Soft if any soft skill keyword matched, otherwise default to hard skill
+    return 'Soft' if hits.get('soft_skill') else 'Hard'
 
 
-def parse_qualifications(text: str, section_context: str = '') -> Dict[str, List[Dict]]:
+def parse_qualifications(text: str, section_context: str = '',
+                         bullets: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
     """
     Parse qualifications section into required and bonus items.
     
     Args:
         text: Qualifications section text
         section_context: Headers or surrounding text for context
+        bullets: Bullet points of text, if already extracted
         
     Returns:
         Dictionary with 'required' and 'bonus' lists
     """
-    bullets = extract_bullet_points(text)
+    if bullets is None:
+        bullets = extract_bullet_points(text)
     
     qualifications = {
         'required': [],
         'bonus': []
     }
     
+    # Lowercase once per bullet; the classifiers all take lowered text
+    context_lower = section_context.lower()
+    
     for bullet in bullets:
-        classification = classify_qualification(bullet, section_context)
-        skill_type = classify_skill_type(bullet)
+        bullet_lower = bullet.lower()
+        classification = classify_qualification(bullet_lower, context_lower)
+        skill_type = classify_skill_type(bullet_lower)
         
         qual_obj = {
             'text': bullet,
@@ -285,99 +454,78 @@ def parse_qualifications(text: str, section_context: str = '') -> Dict[str, List
     return qualifications
 
 
-def extract_ownership_level(text: str) -> str:
+def extract_ownership_level(text_lower: str) -> str:
     """
     Extract ownership level from responsibility text.
     
     Args:
-        text: Responsibility text
+        text_lower: Responsibility text, already lowercased
         
     Returns:
         Ownership level: 'manage', 'lead', 'support', or 'assist'
     """
-    text_lower = text.lower()
-    
-    # Check each ownership level in priority order
-    for level in ['manage', 'lead', 'support', 'assist']:
-        if any(keyword in text_lower for keyword in OWNERSHIP_KEYWORDS[level]):
-            return level
+    hits = _keyword_hits(text_lower)
     
-    # Default to 'lead' if no match
-    return 'lead'
+    # Check each ownership level in priority order; default to 'lead'
+    return _first_bucket(hits, 'ownership', ['manage', 'lead', 'support', 'assist'], 'lead')
 
 
-def extract_frequency(text: str) -> str:
+def extract_frequency(text_lower: str) -> str:
     """
     Extract frequency from responsibility text.
     
     Args:
-        text: Responsibility text
+        text_lower: Responsibility text, already lowercased
         
     Returns:
         Frequency: 'daily', 'weekly', 'regularly', or 'ad-hoc'
     """
-    text_lower = text.lower()
+    hits = _keyword_hits(text_lower)
     
-    # Check each frequency level
-    for freq in ['daily', 'weekly', 'regularly', 'ad-hoc']:
-        if any(keyword in text_lower for keyword in FREQUENCY_KEYWORDS[freq]):
-            return freq
-    
-    # Default to 'regularly' if no match
-    return 'regularly'
+    # Check each frequency level in priority order; default to 'regularly'
+    return _first_bucket(hits, 'frequency', ['daily', 'weekly', 'regularly', 'ad-hoc'], 'regularly')
 
 
-def extract_activity_type(text: str) -> str:
+def extract_activity_type(text_lower: str) -> str:
     """
     Categorize activity into domain type.
     
     Args:
-        text: Activity/responsibility text
+        text_lower: Activity/responsibility text, already lowercased
         
     Returns:
         Activity type category
     """
-    text_lower = text.lower()
-    
-    # Domain keyword mapping
-    domain_map = {
-        'Data Engineering': ['pipeline', 'etl', 'elt', 'ingest', 'data warehouse', 'data lake', 'spark', 'airflow'],
-        'Data Visualization': ['dashboard', 'visualization', 'power bi', 'tableau', 'report', 'visual'],
-        'Analytics': ['analysis', 'analyze', 'metric', 'kpi', 'insight', 'trend', 'statistical'],
-        'Data Science': ['machine learning', 'model', 'algorithm', 'prediction', 'ml', 'ai'],
-        'Database Management': ['database', 'sql', 'query', 'optimization', 'schema', 'index'],
-        'Data Governance': ['quality', 'governance', 'compliance', 'security', 'privacy', 'gdpr'],
-    }
+    hits = _keyword_hits(text_lower)
     
-    # Check each domain
-    for domain, keywords in domain_map.items():
-        if any(keyword in text_lower for keyword in keywords):
-            return domain
-    
-    # Default to general
-    return 'General'
+    # First matching domain in ACTIVITY_DOMAINS order; default to general
+    return _first_bucket(hits, 'activity', list(ACTIVITY_DOMAINS), 'General')
 
 
-def parse_responsibilities(text: str) -> List[Dict]:
+def parse_responsibilities(text: str, bullets: Optional[List[str]] = None) -> List[Dict]:
     """
     Parse responsibilities section.
     
     Args:
         text: Responsibilities section text
+        bullets: Bullet points of text, if already extracted
         
     Returns:
         List of responsibility objects
     """
-    bullets = extract_bullet_points(text)
+    if bullets is None:
+        bullets = extract_bullet_points(text)
     
     responsibilities = []
     
     for bullet in bullets:
+        # Lowercase once per bullet; the classifiers all take lowered text
+        bullet_lower = bullet.lower()
         resp_obj = {
             'activity': bullet,
-            'ownership_level': extract_ownership_level(bullet),
-            'frequency': extract_frequency(bullet),
-            'activity_type': extract_activity_type(bullet)
+            'ownership_level': extract_ownership_level(bullet_lower),
+            'frequency': extract_frequency(bullet_lower),
+            'activity_type': extract_activity_type(bullet_lower)
         }
         responsibilities.append(resp_obj)
     
@@ -394,8 +542,9 @@ def parse_job_description(text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with parsed sections
     """
-    # Detect section boundaries
+    # Detect section boundaries, then pull every section's bullets in one pass
     boundaries = detect_section_boundaries(text)
+    section_bullets = _section_bullets(text, boundaries)
     
     parsed = {
         'qualifications_required': [],
@@ -408,7 +557,8 @@ def parse_job_description(text: str) -> Dict[str, Any]:
     if 'qualifications' in boundaries:
         start, end = boundaries['qualifications']
         qual_text = text[start:end]
-        quals = parse_qualifications(qual_text, qual_text[:200])  # Pass context
+        quals = parse_qualifications(qual_text, qual_text[:200],  # Pass context
+                                     section_bullets['qualifications'])
         parsed['qualifications_required'] = quals['required']
         parsed['qualifications_bonus'] = quals['bonus']
     
@@ -416,7 +566,7 @@ def parse_job_description(text: str) -> Dict[str, Any]:
     if 'responsibilities' in boundaries:
         start, end = boundaries['responsibilities']
         resp_text = text[start:end]
-        parsed['responsibilities'] = parse_responsibilities(resp_text)
+        parsed['responsibilities'] = parse_responsibilities(resp_text, section_bullets['responsibilities'])
     
     # Summary is everything not in other sections
     summary_parts = []
@@ -443,42 +593,29 @@ def parse_job_description(text: str) -> Dict[str, Any]:
 # NLP FEATURE EXTRACTION
 # =============================================
 
-def extract_skills(text: str) -> List[str]:
+def extract_skills(text: str, doc: Optional[Doc] = None) -> List[str]:
     """
     Extract skills and technologies using spaCy NER.
     
     Args:
         text: Text to extract skills from (original casing preserved)
+        doc: Pre-parsed spaCy Doc for text (parsed here if omitted)
         
     Returns:
         List of unique skills
     """
-    doc = nlp(text)
+    if doc is None:
+        doc = _parse(text, _NER_ONLY_DISABLE)
     skills = set()
     
-    # Technology keywords to look for
-    tech_keywords = [
-        'python', 'sql', 'r', 'java', 'javascript', 'c#', 'c++',
-        'power bi', 'tableau', 'excel', 'looker', 'qlik',
-        'azure', 'aws', 'gcp', 'cloud',
-        'spark', 'hadoop', 'kafka', 'airflow',
-        'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch',
-        'git', 'docker', 'kubernetes',
-        'etl', 'elt', 'api', 'rest',
-        'machine learning', 'deep learning', 'nlp', 'ai',
-        'statistics', 'mathematics', 'modeling'
-    ]
-    
-    text_lower = text.lower()
-    
-    # Extract technology keywords
-    for keyword in tech_keywords:
-        if keyword in text_lower:
-            # Find actual casing in original text
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            matches = pattern.findall(text)
-            if matches:
-                skills.add(matches[0])
+    # Extract technology keywords (whole words, as the resume is scanned
+    # for the resume); the first occurrence of each keyword gives its
+    # actual casing in the original text
+    found = set()
+    for keyword, start, end in iter_tech_keywords(text):
+        if keyword not in found:
+            found.add(keyword)
+            skills.add(text[start:end])
     
     # Extract entities that look like technologies
     for ent in doc.ents:
@@ -490,17 +627,19 @@ def extract_skills(text: str) -> List[str]:
     return sorted(list(skills))
 
 
-def extract_entities(text: str) -> Dict[str, List[str]]:
+def extract_entities(text: str, doc: Optional[Doc] = None) -> Dict[str, List[str]]:
     """
     Extract named entities using spaCy.
     
     Args:
         text: Text to extract entities from
+        doc: Pre-parsed spaCy Doc for text (parsed here if omitted)
         
     Returns:
         Dictionary mapping entity types to lists of entities
     """
-    doc = nlp(text)
+    if doc is None:
+        doc = _parse(text, _NER_ONLY_DISABLE)
     
     entities = defaultdict(list)
     
@@ -512,23 +651,26 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
     return {k: list(set(v)) for k, v in entities.items()}
 
 
-def extract_action_verbs(text: str) -> List[str]:
+def extract_action_verbs(text: str, doc: Optional[Doc] = None) -> List[str]:
     """
     Extract action verbs using spaCy POS tagging.
     
     Args:
         text: Text to extract verbs from
+        doc: Pre-parsed spaCy Doc for text (parsed here if omitted)
         
     Returns:
         List of unique action verbs
     """
-    doc = nlp(text)
+    if doc is None:
+        doc = _parse(text, _NO_NER_DISABLE)
     
     verbs = set()
     
     for token in doc:
-        # Look for verbs (not auxiliary/modal verbs)
-        if token.pos_ == 'VERB' and token.dep_ not in ['aux', 'auxpass']:
+        # Look for verbs (not auxiliary/modal verbs). The parser is not loaded,
+        # so modals are filtered by tag; other auxiliaries are already AUX.
+        if token.pos_ == 'VERB' and token.tag_ != 'MD':
             # Get lemma (base form)
             verbs.add(token.lemma_)
     
@@ -545,25 +687,9 @@ def extract_domain_tags(text: str) -> List[str]:
     Returns:
         List of domain tags
     """
-    text_lower = text.lower()
-    
-    domains = []
+    hits = _keyword_hits(text.lower())
     
-    # Domain keyword mapping (reuse from activity_type)
-    domain_map = {
-        'Data Engineering': ['pipeline', 'etl', 'elt', 'ingest', 'data warehouse', 'data lake', 'spark', 'airflow'],
-        'Data Visualization': ['dashboard', 'visualization', 'power bi', 'tableau', 'report', 'visual', 'bi'],
-        'Analytics': ['analysis', 'analyze', 'metric', 'kpi', 'insight', 'trend', 'statistical'],
-        'Data Science': ['machine learning', 'model', 'algorithm', 'prediction', 'ml', 'ai', 'deep learning'],
-        'Database Management': ['database', 'sql', 'query', 'optimization', 'schema', 'index', 'rdbms'],
-        'Data Governance': ['quality', 'governance', 'compliance', 'security', 'privacy', 'gdpr'],
-        'Cloud Computing': ['azure', 'aws', 'gcp', 'cloud', 'saas', 'paas', 'iaas'],
-        'Business Intelligence': ['bi', 'business intelligence', 'reporting', 'power bi', 'tableau', 'looker'],
-    }
-    
-    for domain, keywords in domain_map.items():
-        if any(keyword in text_lower for keyword in keywords):
-            domains.append(domain)
+    domains = hits.get('domain', ())
     
     return sorted(list(set(domains)))
 
@@ -572,12 +698,15 @@ def extract_domain_tags(text: str) -> List[str]:
 # MAIN PREPROCESSING PIPELINE
 # =============================================
 
-def preprocess_job(job_row: Dict[str, Any]) -> Dict[str, Any]:
+def preprocess_job(job_row: Dict[str, Any], clean_desc: Optional[str] = None,
+                   doc: Optional[Doc] = None) -> Dict[str, Any]:
     """
     Full preprocessing pipeline for a single job.
     
     Args:
         job_row: Row from staging.raw_jobs
+        clean_desc: Already-cleaned description (cleaned here if omitted)
+        doc: spaCy Doc for clean_desc, e.g. from nlp.pipe() (parsed here if omitted)
         
     Returns:
         Dictionary ready for staging.job_postings_clean
@@ -588,15 +717,19 @@ def preprocess_job(job_row: Dict[str, Any]) -> Dict[str, Any]:
     print(f"\nProcessing job_id {job_id}: {job_row['company']} - {job_row['job_title']}")
     
     # Step 1: Clean text
-    clean_desc = clean_text(raw_description)
+    if clean_desc is None:
+        clean_desc = clean_text(raw_description)
     
     # Step 2: Parse into structured sections (BEFORE NLP, preserves casing)
     parsed_sections = parse_job_description(clean_desc)
     
-    # Step 3: Extract NLP features (from full clean text, preserves casing)
-    extracted_skills = extract_skills(clean_desc)
-    entities = extract_entities(clean_desc)
-    action_verbs = extract_action_verbs(clean_desc)
+    # Step 3: Extract NLP features (from full clean text, preserves casing).
+    # One Doc serves all three extractors instead of parsing the text 3 times.
+    if doc is None:
+        doc = get_nlp()(clean_desc)
+    extracted_skills = extract_skills(clean_desc, doc)
+    entities = extract_entities(clean_desc, doc)
+    action_verbs = extract_action_verbs(clean_desc, doc)
     domain_tags = extract_domain_tags(clean_desc)
     
     # Step 4: Build cleaned data object
@@ -625,6 +758,24 @@ def preprocess_job(job_row: Dict[str, Any]) -> Dict[str, Any]:
     return cleaned_data
 
 
+def _clean_job_texts(jobs: List[Dict[str, Any]], 
+                     stats: Dict[str, int]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (clean_text, job_row) pairs for nlp.pipe(as_tuples=True).
+    
+    Jobs whose description fails to clean are reported, counted in
+    stats['errors'] and skipped.
+    """
+    for job_dict in jobs:
+        try:
+            clean_desc = clean_text(job_dict['job_description'])
+        except Exception as e:
+            print(f"  ❌ Error processing job_id {job_dict['job_id']}: {e}")
+            stats['errors'] += 1
+            continue
+        yield clean_desc, job_dict
+
+
 def process_all_jobs() -> Dict[str, int]:
     """
     Process all unprocessed jobs in the database.
@@ -634,7 +785,8 @@ def process_all_jobs() -> Dict[str, int]:
     """
     stats = {'processed': 0, 'errors': 0}
     
-    # Get unprocessed jobs
+    # Get unprocessed jobs (via the filtered index)
+    ensure_indexes()
     df_jobs = get_unprocessed_jobs()
     
     if df_jobs.empty:
@@ -644,30 +796,52 @@ def process_all_jobs() -> Dict[str, int]:
     print(f"\nFound {len(df_jobs)} unprocessed job(s)")
     print("="*60)
     
-    # Process each job
-    for idx, row in df_jobs.iterrows():
+    # Worker processes only pay off once there are several batches to share.
+    # as_tuples carries each job's row through the pipe alongside its Doc,
+    # and descriptions are cleaned lazily as spaCy pulls the next batch.
+    n_process = SPACY_N_PROCESS if len(df_jobs) > 2 * SPACY_BATCH_SIZE else 1
+    docs = get_nlp().pipe(_clean_job_texts(df_jobs.to_dict('records'), stats), as_tuples=True,
+                          batch_size=SPACY_BATCH_SIZE, n_process=n_process)
+    
+    # Process each job; results are written one spaCy batch at a time
+    pending = []
+    for doc, job_dict in docs:
         try:
-            # Convert row to dict
-            job_dict = row.to_dict()
-            
-            # Preprocess
-            cleaned_data = preprocess_job(job_dict)
-            
-            # Insert into clean table
-            success = insert_cleaned_job(job_dict['job_id'], cleaned_data)
-            
-            if success:
-                # Mark as processed
-                mark_job_processed(job_dict['job_id'])
-                stats['processed'] += 1
-            
+            cleaned_data = preprocess_job(job_dict, doc.text, doc)
+            pending.append((job_dict['job_id'], cleaned_data))
         except Exception as e:
-            print(f"  ❌ Error processing job_id {row['job_id']}: {e}")
+            print(f"  ❌ Error processing job_id {job_dict['job_id']}: {e}")
             stats['errors'] += 1
+            continue
+        
+        if len(pending) >= SPACY_BATCH_SIZE:
+            _save_cleaned_jobs(pending, stats)
+            pending = []
+    
+    _save_cleaned_jobs(pending, stats)
     
     return stats
 
 
+def _save_cleaned_jobs(pending: List[Tuple[int, Dict[str, Any]]], stats: Dict[str, int]) -> None:
+    """
+    Bulk-insert a batch of cleaned jobs and mark the inserted ones processed.
+    
+    Jobs that were already cleaned are skipped by the insert and left as
+    they are. If the batch fails, every job in it counts as an error.
+    """
+    if not pending:
+        return
+    
+    try:
+        job_ids = insert_cleaned_jobs_bulk(pending)
+        mark_jobs_processed(job_ids)
+        stats['processed'] += len(job_ids)
+    except Exception as e:
+        print(f"  ❌ Error saving {len(pending)} cleaned job(s): {e}")
+        stats['errors'] += len(pending)
+
+
 # =============================================
 # CLI Interface
 # =============================================
@@ -6,22 +6,53 @@ Compares job embeddings against resume embeddings to find best matches.
 import json
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime
 
+# Optional: numba compiles the single-pair cosine kernel to machine code
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 from src.config import (
     SCORE_WEIGHTS, FIT_THRESHOLD, CURRENT_RESUME_VERSION,
-    RESULTS_DIR, EXPORT_SUMMARY_CSV, EXPORT_GRANULAR_JSON
+    RESULTS_DIR, EXPORT_SUMMARY_CSV, EXPORT_GRANULAR_JSON, find_tech_keywords
 )
 from src.vectorize import load_embeddings
-from src.db_utils import execute_query_df, get_connection
+from src.db_utils import execute_query_df, managed_cursor, load_clean_jobs
 
 
 # =============================================
 # SIMILARITY CALCULATIONS
 # =============================================
 
+def _cosine_py(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two 1-D vectors (0.0 if either is all zeros)."""
+    dot = 0.0
+    norm_a = 0.0
+    norm_b = 0.0
+    for i in range(a.shape[0]):
+        dot += a[i] * b[i]
+        norm_a += a[i] * a[i]
+        norm_b += b[i] * b[i]
+    if norm_a == 0.0 or norm_b == 0.0:
+        return 0.0
+    return dot / (np.sqrt(norm_a) * np.sqrt(norm_b))
+
+
+def _cosine_np(a: np.ndarray, b: np.ndarray) -> float:
+    """NumPy fallback for _cosine_py when numba is not installed."""
+    norm_a = np.linalg.norm(a)
+    norm_b = np.linalg.norm(b)
+    if norm_a == 0.0 or norm_b == 0.0:
+        return 0.0
+    return float(np.dot(a, b) / (norm_a * norm_b))
+
+
+_cosine = njit(cache=True, fastmath=True)(_cosine_py) if njit is not None else _cosine_np
+
+
 def calculate_similarity(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
     """
     Calculate cosine similarity between two embeddings.
@@ -33,19 +64,41 @@ def calculate_similarity(embedding1: np.ndarray, embedding2: np.ndarray) -> floa
     Returns:
         Similarity score between 0 and 1
     """
-    # Reshape for sklearn
-    emb1 = np.array(embedding1).reshape(1, -1)
-    emb2 = np.array(embedding2).reshape(1, -1)
+    # Flatten to contiguous float64 so the compiled kernel sees one dtype
+    emb1 = np.ascontiguousarray(embedding1, dtype=np.float64).ravel()
+    emb2 = np.ascontiguousarray(embedding2, dtype=np.float64).ravel()
     
-    similarity = cosine_similarity(emb1, emb2)[0][0]
+    similarity = float(_cosine(emb1, emb2))
     
     # Ensure result is between 0 and 1
     return max(0.0, min(1.0, similarity))
 
 
+def build_resume_matrix(df_resume: pd.DataFrame) -> np.ndarray:
+    """
+    Stack resume embeddings into one L2-normalized float32 matrix.
+    
+    Args:
+        df_resume: DataFrame with resume embeddings
+        
+    Returns:
+        (n_rows, dim) array whose rows are unit-length (zero rows stay zero)
+    """
+    matrix = np.stack(df_resume['embedding'].to_numpy()).astype(np.float32)
+    
+    # Files written by vectorize already hold unit vectors
+    if df_resume.attrs.get('normalized'):
+        return matrix
+    
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
 def find_best_resume_matches(job_embedding: np.ndarray, 
                              df_resume: pd.DataFrame,
-                             top_n: int = 5) -> List[Dict]:
+                             top_n: int = 5,
+                             resume_matrix: np.ndarray = None) -> List[Dict]:
     """
     Find top N best matching resume content for a job.
     
@@ -53,27 +106,94 @@ def find_best_resume_matches(job_embedding: np.ndarray,
         job_embedding: Job embedding vector
         df_resume: DataFrame with resume embeddings
         top_n: Number of top matches to return
+        resume_matrix: build_resume_matrix(df_resume), if already computed
         
     Returns:
         List of top matches with scores
     """
-    matches = []
+    if resume_matrix is None:
+        resume_matrix = build_resume_matrix(df_resume)
+    
+    # Cosine similarity against every resume row in one matrix-vector product
+    query = np.asarray(job_embedding, dtype=np.float32)
+    query_norm = np.linalg.norm(query)
+    if query_norm == 0:
+        similarities = np.zeros(len(resume_matrix), dtype=np.float32)
+    else:
+        similarities = resume_matrix @ (query / query_norm)
+    
+    # Ensure results are between 0 and 1
+    similarities = np.clip(similarities, 0.0, 1.0)
+    
+    # Sort by similarity (stable, so ties keep resume order) and take top N
+    top = np.argsort(-similarities, kind='stable')[:top_n]
+    
+    return _resume_match_records(df_resume, similarities, top)
+
+
+def _resume_match_records(df_resume: pd.DataFrame, similarities: np.ndarray,
+                          top: np.ndarray) -> List[Dict]:
+    """Build find_best_resume_matches() result dicts for the resume rows in top."""
+    subsections = df_resume['subsection'] if 'subsection' in df_resume else None
+    
+    return [
+        {
+            'section': df_resume['section'].iat[i],
+            'subsection': subsections.iat[i] if subsections is not None else None,
+            'content_type': df_resume['content_type'].iat[i],
+            'text': df_resume['text'].iat[i],
+            'similarity': float(similarities[i])
+        }
+        for i in top
+    ]
+
+
+def match_all_jobs(df_jobs: pd.DataFrame,
+                   df_resume: pd.DataFrame,
+                   resume_matrix: np.ndarray = None,
+                   top_n: int = 5) -> Dict[int, Tuple[float, List[Dict]]]:
+    """
+    Compare every job's full description against the resume in one matrix product.
     
-    for idx, row in df_resume.iterrows():
-        resume_embedding = np.array(row['embedding'])
-        similarity = calculate_similarity(job_embedding, resume_embedding)
+    Args:
+        df_jobs: DataFrame with job embeddings
+        df_resume: DataFrame with resume embeddings
+        resume_matrix: build_resume_matrix(df_resume), if already computed
+        top_n: Number of top resume matches to keep per job
         
-        matches.append({
-            'section': row['section'],
-            'subsection': row.get('subsection'),
-            'content_type': row['content_type'],
-            'text': row['text'],
-            'similarity': similarity
-        })
+    Returns:
+        Dict mapping job_id to (overall_similarity, best_resume_matches),
+        as score_job() would compute them; jobs without a
+        full_description embedding are left out
+    """
+    full_desc = df_jobs[df_jobs['section'] == 'full_description'].drop_duplicates('job_id')
+    
+    if full_desc.empty:
+        return {}
+    
+    if resume_matrix is None:
+        resume_matrix = build_resume_matrix(df_resume)
+    
+    # (n_jobs, dim) @ (dim, n_resume): cosine of every job against every resume row
+    queries = np.stack(full_desc['embedding'].to_numpy()).astype(np.float32)
+    if not df_jobs.attrs.get('normalized'):
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries /= norms
+    similarities = np.clip(queries @ resume_matrix.T, 0.0, 1.0)
+    
+    overall_position = int(np.flatnonzero((df_resume['section'] == 'overall_resume').to_numpy())[0])
+    
+    # Sort each row by similarity (stable, so ties keep resume order)
+    top = np.argsort(-similarities, axis=1, kind='stable')[:, :top_n]
     
-    # Sort by similarity and return top N
-    matches.sort(key=lambda x: x['similarity'], reverse=True)
-    return matches[:top_n]
+    return {
+        job_id: (
+            float(similarities[row, overall_position]),
+            _resume_match_records(df_resume, similarities[row], top[row])
+        )
+        for row, job_id in enumerate(full_desc['job_id'])
+    }
 
 
 # =============================================
@@ -90,63 +210,80 @@ def extract_skills_from_job(job_id: int) -> Tuple[List[str], List[str]]:
     Returns:
         Tuple of (all_skills, required_skills)
     """
-    query = f"""
+    query = """
         SELECT extracted_skills, qualifications_required
         FROM staging.job_postings_clean
-        WHERE job_id = {job_id}
+        WHERE job_id = ?
     """
     
-    df = execute_query_df(query)
+    df = execute_query_df(query, params=(int(job_id),))
     
     if df.empty:
         return [], []
     
     row = df.iloc[0]
     
+    return _parse_job_skills(row['extracted_skills'], row['qualifications_required'])
+
+
+def _parse_job_skills(extracted_skills: Optional[str],
+                      qualifications_required: Optional[str]) -> Tuple[List[str], List[str]]:
+    """
+    Decode the JSON skill columns of one staging.job_postings_clean row.
+    
+    NULL columns come through as None or NaN depending on the pandas
+    string dtype, so anything that is not a non-empty string is treated as empty.
+    """
     # All extracted skills
-    all_skills = json.loads(row['extracted_skills']) if row['extracted_skills'] else []
+    all_skills = json.loads(extracted_skills) if isinstance(extracted_skills, str) and extracted_skills else []
     
     # Required skills from qualifications
-    quals_required = json.loads(row['qualifications_required']) if row['qualifications_required'] else []
+    quals_required = (json.loads(qualifications_required)
+                      if isinstance(qualifications_required, str) and qualifications_required else [])
     required_skills = [q['text'] for q in quals_required]
     
     return all_skills, required_skills
 
 
+def load_all_job_skills() -> Dict[int, Tuple[List[str], List[str]]]:
+    """
+    Load skills for every processed job from the cleaned job cache.
+    
+    Returns:
+        Dict mapping job_id to (all_skills, required_skills)
+    """
+    df = load_clean_jobs()
+    
+    return {
+        int(row.job_id): (
+            list(row.extracted_skills or []),
+            [q['text'] for q in row.qualifications_required or []]
+        )
+        for row in df.itertuples(index=False)
+    }
+
+
 def extract_skills_from_resume(df_resume: pd.DataFrame) -> List[str]:
     """
     Extract all skills mentioned in resume.
     
+    Scans the text of every resume row (skills often appear only under
+    experience or projects) against the same TECH_KEYWORDS vocabulary
+    used for job postings.
+    
     Args:
         df_resume: DataFrame with resume embeddings and text
         
     Returns:
         List of skills from resume
     """
-    # Get the TechnicalSkills section
-    tech_skills = df_resume[df_resume['section'] == 'TechnicalSkills']
+    texts = [text for text in df_resume['text'] if isinstance(text, str) and text]
     
-    if tech_skills.empty:
+    if not texts:
         return []
     
-    # Extract skills from technical skills text
-    skills_text = tech_skills.iloc[0]['text'].lower()
-    
-    # Common skill keywords to extract
-    skill_keywords = [
-        'python', 'sql', 'r', 'java', 'javascript', 'c#',
-        'power bi', 'tableau', 'excel', 'looker',
-        'azure', 'aws', 'gcp',
-        'spark', 'hadoop', 'airflow',
-        'pandas', 'numpy', 'scikit-learn',
-        'git', 'docker', 'kubernetes',
-        'machine learning', 'deep learning', 'nlp',
-        'etl', 'api', 'rest'
-    ]
-    
-    found_skills = [skill for skill in skill_keywords if skill in skills_text]
-    
-    return found_skills
+    # One scan over all sections; newlines keep phrases from spanning rows
+    return find_tech_keywords('\n'.join(texts).lower())
 
 
 def calculate_skill_match(job_skills: List[str], 
@@ -161,20 +298,16 @@ def calculate_skill_match(job_skills: List[str],
     Returns:
         Tuple of (matched_skills, missing_skills, match_ratio)
     """
-    # Normalize to lowercase for comparison
-    job_skills_lower = [s.lower() for s in job_skills]
-    resume_skills_lower = [s.lower() for s in resume_skills]
+    # Normalize to lowercase set for O(1) comparison
+    resume_skills_lower = {s.lower() for s in resume_skills}
     
-    # Find matches
+    # Partition job skills into matches and gaps in one pass
     matched = []
+    missing = []
     for job_skill in job_skills:
         if job_skill.lower() in resume_skills_lower:
             matched.append(job_skill)
-    
-    # Find gaps
-    missing = []
-    for job_skill in job_skills:
-        if job_skill.lower() not in resume_skills_lower:
+        else:
             missing.append(job_skill)
     
     # Calculate match ratio
@@ -189,14 +322,24 @@ def calculate_skill_match(job_skills: List[str],
 
 def score_job(job_id: int, 
               df_jobs: pd.DataFrame,
-              df_resume: pd.DataFrame) -> Dict[str, Any]:
+              df_resume: pd.DataFrame,
+              resume_matrix: np.ndarray = None,
+              job_skills: Optional[Tuple[List[str], List[str]]] = None,
+              resume_skills: Optional[List[str]] = None,
+              resume_match: Optional[Tuple[float, List[Dict]]] = None) -> Dict[str, Any]:
     """
     Calculate comprehensive score for a single job.
     
     Args:
         job_id: Job ID to score
-        df_jobs: DataFrame with job embeddings
+        df_jobs: DataFrame with job embeddings (may hold just this job's rows)
         df_resume: DataFrame with resume embeddings
+        resume_matrix: build_resume_matrix(df_resume), if already computed
+        job_skills: (all_skills, required_skills) for this job, e.g. from
+            load_all_job_skills() (queried here if omitted)
+        resume_skills: extract_skills_from_resume(df_resume), if already computed
+        resume_match: This job's (overall_similarity, best_resume_matches)
+            from match_all_jobs() (computed here if omitted)
         
     Returns:
         Dictionary with scoring results
@@ -207,25 +350,33 @@ def score_job(job_id: int,
     if job_embeddings.empty:
         return None
     
-    # Get overall resume embedding
-    overall_resume = df_resume[df_resume['section'] == 'overall_resume'].iloc[0]
-    overall_resume_embedding = np.array(overall_resume['embedding'])
-    
-    # 1. Overall similarity (job full description vs overall resume)
-    full_desc = job_embeddings[job_embeddings['section'] == 'full_description']
-    
-    if not full_desc.empty:
-        job_full_embedding = np.array(full_desc.iloc[0]['embedding'])
-        overall_similarity = calculate_similarity(job_full_embedding, overall_resume_embedding)
+    if resume_match is not None:
+        # 1-2. Already computed for all jobs at once
+        overall_similarity, best_matches = resume_match
     else:
-        overall_similarity = 0.0
-    
-    # 2. Find best matching resume content
-    best_matches = find_best_resume_matches(job_full_embedding, df_resume, top_n=5)
+        # Get overall resume embedding
+        overall_resume = df_resume[df_resume['section'] == 'overall_resume'].iloc[0]
+        overall_resume_embedding = np.array(overall_resume['embedding'])
+        
+        # 1. Overall similarity (job full description vs overall resume)
+        full_desc = job_embeddings[job_embeddings['section'] == 'full_description']
+        
+        if not full_desc.empty:
+            job_full_embedding = np.array(full_desc.iloc[0]['embedding'])
+            overall_similarity = calculate_similarity(job_full_embedding, overall_resume_embedding)
+        else:
+            overall_similarity = 0.0
+        
+        # 2. Find best matching resume content
+        best_matches = find_best_resume_matches(job_full_embedding, df_resume, top_n=5,
+                                                resume_matrix=resume_matrix)
     
     # 3. Skill matching
-    job_skills, required_skills = extract_skills_from_job(job_id)
-    resume_skills = extract_skills_from_resume(df_resume)
+    if job_skills is None:
+        job_skills = extract_skills_from_job(job_id)
+    job_skills, required_skills = job_skills
+    if resume_skills is None:
+        resume_skills = extract_skills_from_resume(df_resume)
     
     matched_skills, missing_skills, skill_match_ratio = calculate_skill_match(
         job_skills, resume_skills
@@ -271,6 +422,22 @@ def score_all_jobs() -> pd.DataFrame:
     df_jobs = load_embeddings('job_embeddings')
     df_resume = load_embeddings('resume_embeddings')
     
+    # Normalize the resume embeddings once for every job's match search
+    resume_matrix = build_resume_matrix(df_resume)
+    
+    # Similarities of every job against every resume row in one GEMM
+    resume_matches = match_all_jobs(df_jobs, df_resume, resume_matrix)
+    
+    # Split job embeddings by job once, rather than filtering all rows per job
+    empty_job = df_jobs.iloc[0:0]
+    job_frames = {job_id: frame for job_id, frame in df_jobs.groupby('job_id', sort=False)}
+    
+    # Fetch every job's skills up front instead of one query per job
+    skills_by_job = load_all_job_skills()
+    
+    # The resume's skills are the same for every job
+    resume_skills = extract_skills_from_resume(df_resume)
+    
     # Get job metadata
     query = """
         SELECT 
@@ -293,20 +460,22 @@ def score_all_jobs() -> pd.DataFrame:
     
     print(f"\nScoring {len(df_metadata)} job(s)...\n")
     
-    for idx, row in df_metadata.iterrows():
-        job_id = row['job_id']
-        print(f"Job {job_id}: {row['company']} - {row['job_title']}")
+    for row in df_metadata.itertuples(index=False):
+        job_id = row.job_id
+        print(f"Job {job_id}: {row.company} - {row.job_title}")
         
-        score_result = score_job(job_id, df_jobs, df_resume)
+        score_result = score_job(job_id, job_frames.get(job_id, empty_job), df_resume,
+                                 resume_matrix, skills_by_job.get(job_id, ([], [])),
+                                 resume_skills, resume_matches.get(job_id))
         
         if score_result:
             # Combine metadata with scores
             score_result.update({
-                'company': row['company'],
-                'job_title': row['job_title'],
-                'location': row['location'],
-                'job_url': row['job_url'],
-                'date_posted': row['date_posted']
+                'company': row.company,
+                'job_title': row.job_title,
+                'location': row.location,
+                'job_url': row.job_url,
+                'date_posted': row.date_posted
             })
             
             scores.append(score_result)
@@ -338,54 +507,48 @@ def store_rankings(df_scores: pd.DataFrame) -> None:
     print("STORING RANKINGS IN DATABASE")
     print("="*60)
     
-    conn = None
-    cursor = None
+    # Serialize every row up front so the driver gets plain Python values
+    rows = [
+        (
+            int(row.job_id),
+            CURRENT_RESUME_VERSION,
+            float(row.composite_score),
+            json.dumps(row.matched_skills),
+            json.dumps(row.missing_skills),
+            int(row.skill_match_count),
+            int(row.skill_gap_count)
+        )
+        for row in df_scores.itertuples(index=False)
+    ]
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Clear existing rankings for this resume version
-        cursor.execute(
-            "DELETE FROM results.job_rankings WHERE resume_version = ?",
-            (CURRENT_RESUME_VERSION,)
-        )
-        
-        # Insert new rankings
-        insert_query = """
-            INSERT INTO results.job_rankings (
-                job_id, resume_version, overall_score,
-                matched_skills, missing_skills,
-                skill_match_count, skill_gap_count
+        # Delete and re-insert in one transaction
+        with managed_cursor(commit=True, action="Store rankings") as (conn, cursor):
+            # Clear existing rankings for this resume version
+            cursor.execute(
+                "DELETE FROM results.job_rankings WHERE resume_version = ?",
+                (CURRENT_RESUME_VERSION,)
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        for idx, row in df_scores.iterrows():
-            cursor.execute(insert_query, (
-                row['job_id'],
-                CURRENT_RESUME_VERSION,
-                row['composite_score'],
-                json.dumps(row['matched_skills']),
-                json.dumps(row['missing_skills']),
-                row['skill_match_count'],
-                row['skill_gap_count']
-            ))
+            
+            # Insert new rankings
+            insert_query = """
+                INSERT INTO results.job_rankings (
+                    job_id, resume_version, overall_score,
+                    matched_skills, missing_skills,
+                    skill_match_count, skill_gap_count
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+            
+            if rows:
+                cursor.fast_executemany = True
+                cursor.executemany(insert_query, rows)
         
-        conn.commit()
-        print(f"\n✓ Stored {len(df_scores)} job rankings in database")
+        print(f"\n✓ Stored {len(rows)} job rankings in database")
         
     except Exception as e:
         print(f"❌ Error storing rankings: {e}")
-        if conn:
-            conn.rollback()
         raise
-        
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
 # =============================================
@@ -487,12 +650,12 @@ if __name__ == "__main__":
     print("TOP 5 JOB MATCHES")
     print("="*60)
     
-    for idx, row in df_scores.head(5).iterrows():
-        print(f"\n#{row['rank']}: {row['company']} - {row['job_title']}")
-        print(f"  Score: {row['composite_score']:.3f}")
-        print(f"  Location: {row['location']}")
-        print(f"  Skills: {row['skill_match_count']} matched, {row['skill_gap_count']} missing")
-        print(f"  URL: {row['job_url']}")
+    for row in df_scores.head(5).itertuples(index=False):
+        print(f"\n#{row.rank}: {row.company} - {row.job_title}")
+        print(f"  Score: {row.composite_score:.3f}")
+        print(f"  Location: {row.location}")
+        print(f"  Skills: {row.skill_match_count} matched, {row.skill_gap_count} missing")
+        print(f"  URL: {row.job_url}")
     
     print("\n" + "="*60)
     print("✓ RANKING COMPLETE!")
@@ -3,89 +3,334 @@ Vectorization module - Generate embeddings for jobs and resume content.
 Uses sentence-transformers for semantic embeddings.
 """
 
+import os
+import sys
 import json
+import hashlib
+import functools
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.compute as pc
 from pathlib import Path
-from typing import List, Dict, Any
+from collections import Counter
+from contextlib import contextmanager, ExitStack
+from typing import List, Dict, Any, Tuple, Union, Optional, Iterator
+import torch
 from sentence_transformers import SentenceTransformer
 
 from src.config import (
-    EMBEDDING_MODEL, RESUME_FILE, VECTORS_DIR,
-    CURRENT_RESUME_VERSION
+    EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_STREAM_ROWS, EMBEDDING_STORE_DTYPE, RESUME_FILE, VECTORS_DIR,
+    CURRENT_RESUME_VERSION, EMBEDDING_DEVICE, EMBEDDING_FP16, EMBEDDING_CPU_THREADS,
+    EMBEDDING_BACKEND, EMBEDDING_ONNX_FILE, EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_FILE,
+    EMBEDDING_ARROW_SIBLING, CLEAN_JOBS_CACHE
 )
-from src.db_utils import execute_query_df
+from src.db_utils import load_clean_jobs
 
-# Load embedding model globally (only load once)
-print(f"Loading embedding model: {EMBEDDING_MODEL}")
-model = SentenceTransformer(EMBEDDING_MODEL)
-print(f"✓ Model loaded: {model.get_sentence_embedding_dimension()}-dimensional embeddings")
+
+def _load_onnx_model(device: str) -> Optional[SentenceTransformer]:
+    """
+    Load EMBEDDING_MODEL on the ONNX Runtime backend.
+    
+    sentence-transformers exports (or downloads) the ONNX graph and does
+    the tokenization and pooling, so encode() output matches the PyTorch
+    model.
+    
+    Returns:
+        The model, or None if the backend is unavailable (caller falls
+        back to PyTorch)
+    """
+    model_kwargs = {'file_name': EMBEDDING_ONNX_FILE} if EMBEDDING_ONNX_FILE else {}
+    
+    try:
+        model = SentenceTransformer(EMBEDDING_MODEL, device=device, backend='onnx',
+                                    model_kwargs=model_kwargs)
+    except Exception as e:
+        print(f"  ⚠️  ONNX backend unavailable ({e}); using PyTorch")
+        return None
+    
+    print(f"  - Using ONNX Runtime ({EMBEDDING_ONNX_FILE or 'model.onnx'})")
+    return model
+
+
+@functools.lru_cache(maxsize=1)
+def get_model() -> SentenceTransformer:
+    """
+    Load the embedding model on first use (only load once).
+    
+    rank.py imports this module only to read saved embeddings, so loading
+    lazily keeps that import from paying for the model.
+    """
+    if EMBEDDING_DEVICE == 'auto':
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    else:
+        device = EMBEDDING_DEVICE
+    
+    print(f"Loading embedding model: {EMBEDDING_MODEL} ({device})")
+    
+    model = _load_onnx_model(device) if EMBEDDING_BACKEND == 'onnx' else None
+    
+    if model is None:
+        model = SentenceTransformer(EMBEDDING_MODEL, device=device)
+        
+        if EMBEDDING_FP16 and device.startswith('cuda'):
+            model.half()
+            print("  - Using fp16 weights")
+        elif device == 'cpu':
+            # Spread each forward pass's matmuls over the configured cores
+            torch.set_num_threads(EMBEDDING_CPU_THREADS)
+            print(f"  - Using {EMBEDDING_CPU_THREADS} CPU thread(s)")
+    
+    print(f"✓ Model loaded: {model.get_sentence_embedding_dimension()}-dimensional embeddings")
+    return model
+
+
+def _text_hash(text: str) -> str:
+    """SHA-256 hex digest of text, the embedding cache key."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _load_embedding_cache() -> Optional[pa.Table]:
+    """
+    Read the embedding cache file.
+    
+    Returns:
+        Table of (hash, model_name, embedding list<float32>), or None if
+        there is no cache yet; caches in the older one-bytes-blob-per-row
+        layout are also treated as missing and rebuilt
+    """
+    if not EMBEDDING_CACHE_FILE.exists():
+        return None
+    
+    table = pq.read_table(EMBEDDING_CACHE_FILE)
+    if not pa.types.is_list(table.schema.field('embedding').type):
+        return None
+    return table
+
+
+def _cache_model_key() -> str:
+    """
+    Embedding cache model_name for the current model ('+l2': unit-normalized).
+    
+    ONNX exports (fp32 or quantized) give different vectors than the
+    PyTorch weights, so the backend and ONNX file are part of the key.
+    """
+    if EMBEDDING_BACKEND == 'onnx':
+        return f"{EMBEDDING_MODEL}+onnx:{EMBEDDING_ONNX_FILE or 'model.onnx'}+l2"
+    return f"{EMBEDDING_MODEL}+l2"
+
+
+def _encode_with_model(texts: List[str], show_progress_bar: bool) -> np.ndarray:
+    """Run the model over texts; returns a (len(texts), dim) float32 array of unit vectors."""
+    # No need to sort by length here: SentenceTransformer.encode already
+    # orders the inputs longest-first before batching (so each batch pads to
+    # similar lengths) and restores the original order in its output
+    embeddings = get_model().encode(
+        texts,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        show_progress_bar=show_progress_bar,
+        convert_to_numpy=True,
+        normalize_embeddings=True  # cosine similarity becomes a plain dot product
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+class _EmbeddingCache:
+    """
+    The embedding cache for EMBEDDING_MODEL, read once and written once.
+    
+    The cache file is read when this is created; rows encoded by later
+    encode() calls are kept in memory and appended to it by flush(). A
+    streaming run shares one instance across all its chunks instead of
+    re-reading and rewriting the whole file for each chunk.
+    """
+    
+    def __init__(self):
+        self._set_table(_load_embedding_cache())
+    
+    def _set_table(self, table: Optional[pa.Table]) -> None:
+        """Index table's rows for the current model; drop any unflushed rows."""
+        self._table = table
+        self._embeddings = None
+        self._index = {}
+        if table is not None:
+            current = table.filter(pc.equal(table['model_name'], _cache_model_key()))
+            self._embeddings = current.column('embedding')
+            self._index = {text_hash: row for row, text_hash in enumerate(current.column('hash').to_pylist())}
+        
+        # Encoded since the file was read: (n, dim) arrays, and hash -> (array, row)
+        self._new_embeddings = []
+        self._new_index = {}
+    
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Embed texts, sending only ones not cached yet to the model.
+        
+        Args:
+            texts: Texts to embed
+            show_progress_bar: Show the sentence-transformers progress bar
+            
+        Returns:
+            (len(texts), dim) float32 array of L2-normalized rows
+        """
+        hashes = [_text_hash(text) for text in texts]
+        
+        # Encode each missing text once, even if it appears several times
+        misses = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in self._index and text_hash not in self._new_index and text_hash not in misses:
+                misses[text_hash] = text
+        
+        if misses:
+            batch = len(self._new_embeddings)
+            self._new_embeddings.append(_encode_with_model(list(misses.values()), show_progress_bar))
+            self._new_index.update((text_hash, (batch, row)) for row, text_hash in enumerate(misses))
+        
+        print(f"  - Embedding cache: {len(texts) - len(misses)} hit(s), {len(misses)} encoded")
+        
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        # Rows from the file: gather just those, not the whole cached matrix
+        old = [i for i, text_hash in enumerate(hashes) if text_hash in self._index]
+        gathered = None
+        if old:
+            rows = self._embeddings.take([self._index[hashes[i]] for i in old])
+            gathered = pc.list_flatten(rows).to_numpy().reshape(len(old), -1)
+        
+        dim = gathered.shape[1] if gathered is not None else self._new_embeddings[0].shape[1]
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        if old:
+            out[old] = gathered
+        for i, text_hash in enumerate(hashes):
+            if text_hash in self._new_index:
+                batch, row = self._new_index[text_hash]
+                out[i] = self._new_embeddings[batch][row]
+        return out
+    
+    def flush(self) -> None:
+        """Append the rows encoded since the file was read and rewrite it once."""
+        if not self._new_embeddings:
+            return
+        
+        embeddings = np.concatenate(self._new_embeddings)
+        hashes = list(self._new_index)  # insertion order matches the stacked rows
+        
+        # Offsets + one flat values buffer; no per-row Python objects
+        offsets = np.arange(0, embeddings.size + 1, embeddings.shape[1], dtype=np.int32)
+        new_rows = pa.table({
+            'hash': hashes,
+            'model_name': [_cache_model_key()] * len(hashes),
+            'embedding': pa.ListArray.from_arrays(pa.array(offsets), pa.array(embeddings.ravel()))
+        })
+        
+        table = new_rows if self._table is None else pa.concat_tables([self._table, new_rows.cast(self._table.schema)])
+        with _replace_on_success(EMBEDDING_CACHE_FILE) as tmp_path:
+            pq.write_table(table, tmp_path)
+        self._set_table(table)
+
+
+def encode_texts(texts: List[str], show_progress_bar: bool = False,
+                 cache: Optional[_EmbeddingCache] = None) -> np.ndarray:
+    """
+    Encode texts in EMBEDDING_BATCH_SIZE batches.
+    
+    Each distinct text is encoded once per call (boilerplate repeated
+    across postings costs one forward pass). Texts already in the
+    embedding cache for EMBEDDING_MODEL are not sent to the model; newly
+    encoded ones are added to the cache.
+    
+    Args:
+        texts: Texts to embed
+        show_progress_bar: Show the sentence-transformers progress bar
+        cache: Embedding cache shared across calls, flushed by the caller;
+            by default the cache file is read and updated within this call
+        
+    Returns:
+        (len(texts), dim) float32 array of L2-normalized rows, also when
+        the model runs in fp16
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        # First-seen order of distinct texts, and each text's row among them
+        positions = {}
+        inverse = [positions.setdefault(text, len(positions)) for text in texts]
+        
+        embeddings = _encode_with_model(list(positions), show_progress_bar)
+        if len(positions) == len(texts):
+            return embeddings
+        
+        print(f"  - {len(texts) - len(positions)} duplicate text(s) reused")
+        return embeddings[inverse]
+    
+    if cache is not None:
+        return cache.encode(texts, show_progress_bar)
+    
+    cache = _EmbeddingCache()
+    embeddings = cache.encode(texts, show_progress_bar)
+    cache.flush()
+    return embeddings
 
 
 # =============================================
 # JOB EMBEDDINGS
 # =============================================
 
-def generate_job_embeddings() -> pd.DataFrame:
+def _append_row(columns: Dict[str, List[Any]], **values: Any) -> None:
+    """Append one embedding's metadata to the column lists in columns."""
+    for name, value in values.items():
+        columns[name].append(value)
+
+
+def collect_job_texts() -> Tuple[List[str], Dict[str, List[Any]]]:
     """
-    Generate embeddings for all processed jobs.
-    Creates embeddings for:
+    Collect the texts to embed for all processed jobs.
+    Covers:
     - Full job description
     - Qualifications section
     - Responsibilities section
     - Summary section
     
     Returns:
-        DataFrame with job embeddings
+        Tuple of (texts, columns): metadata column lists, one entry per text
     """
     print("\n" + "="*60)
     print("GENERATING JOB EMBEDDINGS")
     print("="*60)
     
-    # Get all processed jobs
-    query = """
-        SELECT 
-            job_id,
-            job_title_clean,
-            company,
-            description_clean,
-            qualifications_required,
-            qualifications_bonus,
-            responsibilities,
-            summary
-        FROM staging.job_postings_clean
-    """
-    
-    df_jobs = execute_query_df(query)
+    # Get all processed jobs (JSON columns come back already decoded)
+    df_jobs = load_clean_jobs()
     
     if df_jobs.empty:
         print("⚠️  No processed jobs found")
-        return pd.DataFrame()
+        return [], {}
     
     print(f"\nGenerating embeddings for {len(df_jobs)} job(s)...")
     
-    embeddings_data = []
+    # Collect every section text; all are encoded together by the caller
+    columns = {'job_id': [], 'section': [], 'subsection': [], 'text': []}
+    section_texts = []
     
-    for idx, row in df_jobs.iterrows():
-        job_id = row['job_id']
-        print(f"\nJob {job_id}: {row['company']} - {row['job_title_clean']}")
+    for row in df_jobs.itertuples(index=False):
+        job_id = row.job_id
+        print(f"\nJob {job_id}: {row.company} - {row.job_title_clean}")
         
         # 1. Full description embedding
-        full_text = row['description_clean']
+        full_text = row.description_clean
         if full_text:
-            embedding = model.encode(full_text, show_progress_bar=False)
-            embeddings_data.append({
-                'job_id': job_id,
-                'section': 'full_description',
-                'subsection': None,
-                'text': full_text[:500],  # Store truncated text for reference
-                'embedding': embedding.tolist()
-            })
+            _append_row(
+                columns,
+                job_id=job_id,
+                section='full_description',
+                subsection=None,
+                text=full_text[:500]  # Store truncated text for reference
+            )
+            section_texts.append(full_text)
             print(f"  ✓ Full description embedding")
         
         # 2. Qualifications embedding (combine required + bonus)
-        quals_req = json.loads(row['qualifications_required']) if row['qualifications_required'] else []
-        quals_bonus = json.loads(row['qualifications_bonus']) if row['qualifications_bonus'] else []
+        quals_req = row.qualifications_required or []
+        quals_bonus = row.qualifications_bonus or []
         
         if quals_req or quals_bonus:
             # Combine all qualification text
@@ -93,18 +338,18 @@ def generate_job_embeddings() -> pd.DataFrame:
             qual_combined = ' '.join(qual_texts)
             
             if qual_combined:
-                embedding = model.encode(qual_combined, show_progress_bar=False)
-                embeddings_data.append({
-                    'job_id': job_id,
-                    'section': 'qualifications',
-                    'subsection': None,
-                    'text': qual_combined[:500],
-                    'embedding': embedding.tolist()
-                })
+                _append_row(
+                    columns,
+                    job_id=job_id,
+                    section='qualifications',
+                    subsection=None,
+                    text=qual_combined[:500]
+                )
+                section_texts.append(qual_combined)
                 print(f"  ✓ Qualifications embedding ({len(quals_req)} required, {len(quals_bonus)} bonus)")
         
         # 3. Responsibilities embedding
-        responsibilities = json.loads(row['responsibilities']) if row['responsibilities'] else []
+        responsibilities = row.responsibilities or []
         
         if responsibilities:
             # Combine all responsibility activities
@@ -112,35 +357,32 @@ def generate_job_embeddings() -> pd.DataFrame:
             resp_combined = ' '.join(resp_texts)
             
             if resp_combined:
-                embedding = model.encode(resp_combined, show_progress_bar=False)
-                embeddings_data.append({
-                    'job_id': job_id,
-                    'section': 'responsibilities',
-                    'subsection': None,
-                    'text': resp_combined[:500],
-                    'embedding': embedding.tolist()
-                })
+                _append_row(
+                    columns,
+                    job_id=job_id,
+                    section='responsibilities',
+                    subsection=None,
+                    text=resp_combined[:500]
+                )
+                section_texts.append(resp_combined)
                 print(f"  ✓ Responsibilities embedding ({len(responsibilities)} items)")
         
         # 4. Summary embedding
-        summary = row['summary']
+        summary = row.summary
         if summary and len(summary.strip()) > 50:  # Only if substantial summary exists
-            embedding = model.encode(summary, show_progress_bar=False)
-            embeddings_data.append({
-                'job_id': job_id,
-                'section': 'summary',
-                'subsection': None,
-                'text': summary[:500],
-                'embedding': embedding.tolist()
-            })
+            _append_row(
+                columns,
+                job_id=job_id,
+                section='summary',
+                subsection=None,
+                text=summary[:500]
+            )
+            section_texts.append(summary)
             print(f"  ✓ Summary embedding")
     
-    # Convert to DataFrame
-    df_embeddings = pd.DataFrame(embeddings_data)
-    
-    print(f"\n✓ Generated {len(df_embeddings)} embeddings for {len(df_jobs)} jobs")
+    print(f"\n✓ Collected {len(section_texts)} section text(s) from {len(df_jobs)} job(s)")
     
-    return df_embeddings
+    return section_texts, columns
 
 
 # =============================================
@@ -163,194 +405,582 @@ def load_resume() -> Dict[str, Any]:
     return resume
 
 
-def generate_resume_embeddings() -> pd.DataFrame:
+def _resume_item_parts(item: Dict[str, Any]) -> Iterator[str]:
+    """Yield an item's Content, Subsection and Bullet texts (for the overall text)."""
+    if 'Content' in item:
+        yield item['Content']
+    if 'Subsection' in item:
+        yield item['Subsection']
+    if isinstance(item.get('Bullet'), list):
+        yield from item['Bullet']
+
+
+def _iter_resume_entries(resume: Dict[str, Any]) -> Iterator[Tuple[str, Optional[str], str, str]]:
+    """
+    Yield (section, subsection, content_type, text) for every resume entry
+    that gets its own embedding, in document order.
+    
+    - Content-only items (Summary, TechnicalSkills): one 'content' entry
+    - Subsection items (Projects, Experience...): one 'subsection' entry
+      for the header plus bullets combined, then one 'bullet' entry each
+    """
+    for section_name, section_content in resume.items():
+        if not isinstance(section_content, list):
+            continue
+        
+        for item in section_content:
+            if 'Subsection' in item:
+                subsection_name = item['Subsection']
+                bullets = item['Bullet'] if isinstance(item.get('Bullet'), list) else []
+                
+                yield section_name, subsection_name, 'subsection', ' '.join([subsection_name] + bullets)
+                for bullet in bullets:
+                    yield section_name, subsection_name, 'bullet', bullet
+            
+            elif 'Content' in item:
+                yield section_name, None, 'content', item['Content']
+
+
+def collect_resume_texts() -> Tuple[List[str], Dict[str, List[Any]]]:
     """
-    Generate embeddings for resume content.
-    Creates embeddings for:
+    Collect the texts to embed for resume content.
+    Covers:
     - Overall resume
     - Each major section
     - Each bullet point within sections
     
     Returns:
-        DataFrame with resume embeddings
+        Tuple of (texts, columns): metadata column lists, one entry per text
     """
     print("\n" + "="*60)
     print("GENERATING RESUME EMBEDDINGS")
     print("="*60)
     
     resume = load_resume()
-    embeddings_data = []
     
-    # 1. Generate overall resume embedding
-    print("\nGenerating overall resume embedding...")
+    # Every text is collected first; the caller encodes them in one batch
+    columns = {
+        'resume_version': [], 'section': [], 'subsection': [],
+        'content_type': [], 'text': []
+    }
+    texts = []
     
-    # Combine all text from resume
-    all_text_parts = []
+    # 1. Generate overall resume embedding (all text from resume)
+    print("\nGenerating overall resume embedding...")
     
-    for section_name, section_content in resume.items():
-        if not isinstance(section_content, list):
-            continue
-        
-        for item in section_content:
-            # Add main content
-            if 'Content' in item:
-                all_text_parts.append(item['Content'])
-            
-            # Add subsection
-            if 'Subsection' in item:
-                all_text_parts.append(item['Subsection'])
-            
-            # Add bullets
-            if 'Bullet' in item and isinstance(item['Bullet'], list):
-                all_text_parts.extend(item['Bullet'])
-    
-    overall_text = ' '.join(all_text_parts)
-    overall_embedding = model.encode(overall_text, show_progress_bar=False)
-    
-    embeddings_data.append({
-        'resume_version': CURRENT_RESUME_VERSION,
-        'section': 'overall_resume',
-        'subsection': None,
-        'content_type': 'full_resume',
-        'text': overall_text[:500],
-        'embedding': overall_embedding.tolist()
-    })
+    overall_text = ' '.join(
+        part
+        for section_content in resume.values() if isinstance(section_content, list)
+        for item in section_content
+        for part in _resume_item_parts(item)
+    )
+    
+    _append_row(
+        columns,
+        resume_version=CURRENT_RESUME_VERSION,
+        section='overall_resume',
+        subsection=None,
+        content_type='full_resume',
+        text=overall_text[:500]
+    )
+    texts.append(overall_text)
     print(f"  ✓ Overall resume embedding")
     
-    # 2. Generate section-level embeddings
+    # 2. Generate section, subsection and bullet embeddings in one pass
     print("\nGenerating section embeddings...")
     
-    for section_name, section_content in resume.items():
-        if not isinstance(section_content, list):
-            continue
-        
-        print(f"\n{section_name}:")
-        
-        for item_idx, item in enumerate(section_content):
-            # Handle sections with just Content (Summary, TechnicalSkills)
-            if 'Content' in item and 'Subsection' not in item:
-                content = item['Content']
-                embedding = model.encode(content, show_progress_bar=False)
-                
-                embeddings_data.append({
-                    'resume_version': CURRENT_RESUME_VERSION,
-                    'section': section_name,
-                    'subsection': None,
-                    'content_type': 'content',
-                    'text': content[:500],
-                    'embedding': embedding.tolist()
-                })
-                print(f"  ✓ Content embedding")
-            
-            # Handle sections with Subsection + Bullets (Projects, Experience, etc.)
-            if 'Subsection' in item:
-                subsection_name = item['Subsection']
-                
-                # Create embedding for subsection header + bullets combined
-                subsection_parts = [subsection_name]
-                
-                if 'Bullet' in item and isinstance(item['Bullet'], list):
-                    subsection_parts.extend(item['Bullet'])
-                
-                subsection_text = ' '.join(subsection_parts)
-                embedding = model.encode(subsection_text, show_progress_bar=False)
-                
-                embeddings_data.append({
-                    'resume_version': CURRENT_RESUME_VERSION,
-                    'section': section_name,
-                    'subsection': subsection_name,
-                    'content_type': 'subsection',
-                    'text': subsection_text[:500],
-                    'embedding': embedding.tolist()
-                })
-                print(f"  ✓ {subsection_name[:50]}...")
-                
-                # Also create embeddings for individual bullets
-                if 'Bullet' in item and isinstance(item['Bullet'], list):
-                    for bullet_idx, bullet in enumerate(item['Bullet']):
-                        embedding = model.encode(bullet, show_progress_bar=False)
-                        
-                        embeddings_data.append({
-                            'resume_version': CURRENT_RESUME_VERSION,
-                            'section': section_name,
-                            'subsection': subsection_name,
-                            'content_type': 'bullet',
-                            'text': bullet[:500],
-                            'embedding': embedding.tolist()
-                        })
-                    print(f"    ✓ {len(item['Bullet'])} bullet embeddings")
+    for section_name, subsection, content_type, text in _iter_resume_entries(resume):
+        _append_row(
+            columns,
+            resume_version=CURRENT_RESUME_VERSION,
+            section=section_name,
+            subsection=subsection,
+            content_type=content_type,
+            text=text[:500]
+        )
+        texts.append(text)
     
-    # Convert to DataFrame
-    df_embeddings = pd.DataFrame(embeddings_data)
+    for section_name, count in Counter(columns['section'][1:]).items():
+        print(f"  ✓ {section_name}: {count} embedding(s)")
     
-    print(f"\n✓ Generated {len(df_embeddings)} resume embeddings")
+    print(f"\n✓ Collected {len(texts)} resume text(s)")
     
-    return df_embeddings
+    return texts, columns
 
 
 # =============================================
 # SAVE/LOAD FUNCTIONS
 # =============================================
 
-def save_embeddings(df: pd.DataFrame, filename: str) -> Path:
+def _embedding_array(matrix: np.ndarray, dtype: Any = np.float32) -> pa.FixedSizeListArray:
+    """(n_rows, dim) matrix as a fixed_size_list<dtype>[dim] array over one buffer."""
+    matrix = np.ascontiguousarray(matrix, dtype=dtype)
+    return pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), matrix.shape[1])
+
+
+def _embedding_matrix(column: Union[pa.Array, pa.ChunkedArray]) -> np.ndarray:
+    """Fixed-size list embedding column back to an (n_rows, dim) matrix."""
+    if isinstance(column, pa.ChunkedArray):
+        # combine_chunks() copies even a single chunk
+        column = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    flat = column.flatten().to_numpy(zero_copy_only=False)
+    return flat.reshape(len(column), column.type.list_size)
+
+
+def _build_embeddings_table(columns: Dict[str, List[Any]], embeddings: np.ndarray) -> pa.Table:
+    """
+    Arrow table of embedding metadata columns plus their float32 embeddings.
+    
+    Args:
+        columns: Metadata column lists (job_id/section/text...), one entry
+            per embedding
+        embeddings: (n_rows, dim) matrix, in the same order
+    """
+    if len(embeddings) == 0:
+        return pa.table({})
+    
+    # Built column by column; no per-row dicts to walk for the schema
+    table = pa.table(columns)
+    return table.append_column('embedding', _embedding_array(embeddings))
+
+
+def _embeddings_table(embeddings: Union[pa.Table, pd.DataFrame],
+                      dtype: Any = EMBEDDING_STORE_DTYPE) -> pa.Table:
+    """
+    Table to write to disk, with embeddings cast to dtype.
+    
+    The embedding column is a fixed_size_list<dtype> column backed by one
+    contiguous (n_rows * dim) buffer, instead of a variable-length list or
+    bytes value per row. For 'int8', rows are quantized with a per-row
+    scale stored next to them in a float32 'embedding_scale' column.
+    """
+    if isinstance(embeddings, pd.DataFrame):
+        df = embeddings
+        if 'embedding' not in df or df.empty:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        table = pa.Table.from_pandas(df.drop(columns=['embedding']), preserve_index=False)
+        matrix = np.stack(df['embedding'].to_numpy())
+        position = table.num_columns
+    else:
+        table = embeddings
+        if 'embedding' not in table.column_names or table.num_rows == 0:
+            return table
+        position = table.column_names.index('embedding')
+        matrix = _embedding_matrix(table.column('embedding'))
+        table = table.remove_column(position)
+    
+    if np.dtype(dtype) == np.int8:
+        quantized, scale = _quantize_int8(matrix)
+        table = table.add_column(position, 'embedding_scale', pa.array(scale))
+        return table.add_column(position, 'embedding', _embedding_array(quantized, np.int8))
+    
+    return table.add_column(position, 'embedding', _embedding_array(matrix, dtype))
+
+
+def _quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization: row ~= quantized * scale.
+    
+    Returns:
+        Tuple of ((n_rows, dim) int8 matrix, (n_rows,) float32 scales)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scale = np.abs(matrix).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0
+    quantized = np.round(matrix / scale[:, None]).astype(np.int8)
+    return quantized, scale.astype(np.float32)
+
+
+def _embeddings_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert a table read from parquet back to an embeddings DataFrame.
+    
+    Embeddings come back as float32 vectors (views into one matrix).
+    Files from before fixed-size lists hold raw bytes (dtype in the pandas
+    metadata) or plain float lists; both still load.
+    
+    df.attrs['normalized'] is True when the file says its rows are unit
+    vectors, so consumers can skip re-normalizing them.
+    """
+    normalized = (table.schema.metadata or {}).get(b'normalized') == b'l2'
+    
+    if 'embedding' not in table.column_names or table.num_rows == 0:
+        df = table.to_pandas()
+    elif not pa.types.is_fixed_size_list(table.column('embedding').type):
+        df = _unpack_legacy_embeddings(table.to_pandas())
+    else:
+        # One flat buffer -> (n_rows, dim) without touching rows one at a time
+        column = table.column('embedding')
+        matrix = _embedding_matrix(column).astype(np.float32, copy=False)
+        
+        df = table.drop_columns(['embedding']).to_pandas()
+        
+        if pa.types.is_int8(column.type.value_type) and 'embedding_scale' in df:
+            # int8 file: dequantize (astype above already made a copy).
+            # Rounding moves rows slightly off unit length, so let
+            # consumers re-normalize
+            matrix *= df.pop('embedding_scale').to_numpy(dtype=np.float32)[:, None]
+            normalized = False
+        
+        df['embedding'] = list(matrix)
+    
+    df.attrs['normalized'] = normalized
+    return df
+
+
+def _unpack_legacy_embeddings(df: pd.DataFrame) -> pd.DataFrame:
+    """Decode bytes or list embeddings from older files to float32 vectors (in place)."""
+    if isinstance(df['embedding'].iat[0], bytes):
+        dtype = df.attrs.get('embedding_dtype', 'float16')
+        df['embedding'] = [
+            np.frombuffer(blob, dtype=dtype).astype(np.float32)
+            for blob in df['embedding']
+        ]
+    else:
+        df['embedding'] = [np.asarray(embedding, dtype=np.float32) for embedding in df['embedding']]
+    
+    return df
+
+
+# Repeated labels; dictionary-encoded on write
+_DICTIONARY_COLUMNS = ('section', 'subsection', 'content_type', 'resume_version')
+
+# Parquet layout shared by save_embeddings and save_embeddings_streaming
+_PARQUET_OPTIONS = {
+    'compression': 'zstd',
+    'compression_level': 3,
+    'use_dictionary': list(_DICTIONARY_COLUMNS),
+    'data_page_size': 256 * 1024
+}
+_PARQUET_ROW_GROUP_SIZE = 1024
+
+
+@contextmanager
+def _replace_on_success(filepath: Path) -> Iterator[Path]:
+    """
+    Yield a temp path to write instead of filepath.
+    
+    If the block succeeds, the temp file replaces filepath with os.replace().
+    If it raises, the temp file is deleted and filepath is left alone. Readers
+    never see a partial file, and a file that is still memory-mapped is
+    swapped out instead of truncated under its reader.
+    """
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    try:
+        yield tmp_path
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, filepath)
+
+
+def _with_model_metadata(schema: pa.Schema) -> pa.Schema:
+    """
+    Schema tagged with EMBEDDING_MODEL (so is_up_to_date() can tell stale
+    files apart) and normalized=l2 (rows are unit vectors, see encode_texts).
+    """
+    return schema.with_metadata({
+        **(schema.metadata or {}),
+        b'embedding_model': EMBEDDING_MODEL.encode(),
+        b'normalized': b'l2'
+    })
+
+
+def save_embeddings(embeddings: Union[pa.Table, pd.DataFrame], filename: str) -> Path:
     """
     Save embeddings DataFrame to parquet file.
     
+    Embeddings are stored as one fixed-size list column of
+    EMBEDDING_STORE_DTYPE (float16 by default, half the size of float32;
+    int8 with per-row scales for a quarter), ZSTD-compressed. The low-cardinality label columns are
+    dictionary-encoded, and small row groups let filtered reads (see
+    load_embeddings) skip most of the file.
+    
     Args:
-        df: DataFrame with embeddings
+        embeddings: Table from _build_embeddings_table (or a DataFrame with
+            one vector per row in 'embedding')
         filename: Output filename (without extension)
         
     Returns:
         Path to saved file
     """
     filepath = VECTORS_DIR / f"{filename}.parquet"
-    df.to_parquet(filepath, index=False)
+    table = _embeddings_table(embeddings)
+    
+    with _replace_on_success(filepath) as tmp_path:
+        pq.write_table(
+            table.replace_schema_metadata(_with_model_metadata(table.schema).metadata),
+            tmp_path,
+            row_group_size=_PARQUET_ROW_GROUP_SIZE,
+            **_PARQUET_OPTIONS
+        )
+    _drop_stale_arrow(filepath)
+    print(f"\n✓ Saved embeddings to: {filepath}")
+    return filepath
+
+
+def _drop_stale_arrow(filepath: Path) -> None:
+    """Remove an .arrow sibling left from a float32 run when siblings are off."""
+    if not EMBEDDING_ARROW_SIBLING:
+        filepath.with_suffix('.arrow').unlink(missing_ok=True)
+
+
+def save_embeddings_streaming(texts: List[str], columns: Dict[str, List[Any]],
+                              filename: str, chunk_rows: int = EMBEDDING_STREAM_ROWS) -> Optional[Path]:
+    """
+    Encode texts and write their embeddings to disk chunk by chunk.
+    
+    Each chunk of chunk_rows texts is encoded and appended to the parquet
+    file (and its .arrow sibling, see EMBEDDING_ARROW_SIBLING) before the
+    next one is encoded, so only one chunk of embeddings is in memory at a
+    time. The files are laid out
+    like save_embeddings / save_embeddings_arrow output.
+    
+    The files are written under temp names and replace the old ones only
+    once every chunk has been written; if encoding fails part-way, the
+    previous files stay as they were (and stay stale for is_up_to_date).
+    The embedding cache is read once up front and written once at the end.
+    
+    Args:
+        texts: Texts to embed
+        columns: Metadata column lists, one entry per text
+        filename: Output filename (without extension)
+        chunk_rows: Texts encoded per chunk
+        
+    Returns:
+        Path to the parquet file, or None if there were no texts
+    """
+    if not texts:
+        return None
+    
+    filepath = VECTORS_DIR / f"{filename}.parquet"
+    arrow_path = filepath.with_suffix('.arrow')
+    
+    cache = _EmbeddingCache() if EMBEDDING_CACHE_ENABLED else None
+    
+    with ExitStack() as stack:
+        tmp_parquet = stack.enter_context(_replace_on_success(filepath))
+        tmp_arrow = stack.enter_context(_replace_on_success(arrow_path)) if EMBEDDING_ARROW_SIBLING else None
+        _stream_embeddings(texts, columns, chunk_rows, tmp_parquet, tmp_arrow, cache)
+    _drop_stale_arrow(filepath)
+    
+    if cache is not None:
+        cache.flush()
+    
     print(f"\n✓ Saved embeddings to: {filepath}")
     return filepath
 
 
-def load_embeddings(filename: str) -> pd.DataFrame:
+def _stream_embeddings(texts: List[str], columns: Dict[str, List[Any]], chunk_rows: int,
+                       parquet_path: Path, arrow_path: Optional[Path],
+                       cache: Optional[_EmbeddingCache]) -> None:
+    """Encode and write chunks for save_embeddings_streaming; always closes the writers."""
+    parquet_writer = arrow_writer = None
+    
+    try:
+        for start in range(0, len(texts), chunk_rows):
+            chunk_texts = texts[start:start + chunk_rows]
+            embeddings = encode_texts(chunk_texts, show_progress_bar=len(chunk_texts) > EMBEDDING_BATCH_SIZE, cache=cache)
+            
+            table = _build_embeddings_table(
+                {name: values[start:start + chunk_rows] for name, values in columns.items()},
+                embeddings
+            )
+            stored = _embeddings_table(table)
+            
+            # Writers are opened once the first chunk fixes the schema
+            if parquet_writer is None:
+                parquet_writer = pq.ParquetWriter(parquet_path, _with_model_metadata(stored.schema), **_PARQUET_OPTIONS)
+                if arrow_path is not None:
+                    arrow_schema = _with_model_metadata(table.schema)
+                    arrow_writer = pa.ipc.new_file(str(arrow_path), arrow_schema)
+            
+            parquet_writer.write_table(stored.cast(parquet_writer.schema), row_group_size=_PARQUET_ROW_GROUP_SIZE)
+            if arrow_writer is not None:
+                arrow_writer.write_table(table.cast(arrow_schema), max_chunksize=table.num_rows)
+            
+            if len(texts) > chunk_rows:
+                print(f"  - Wrote {start + len(chunk_texts)}/{len(texts)} embeddings")
+    
+    finally:
+        # Parquet first, so the .arrow file ends up no older than it
+        for writer in (parquet_writer, arrow_writer):
+            if writer is not None:
+                writer.close()
+
+
+def load_embeddings(filename: str, columns: Optional[List[str]] = None,
+                    filters: Optional[List[Tuple[str, str, Any]]] = None) -> pd.DataFrame:
     """
     Load embeddings from parquet file.
     
     Args:
         filename: Filename (without extension)
+        columns: Only read these columns (default: all)
+        filters: pyarrow row filters, e.g. [('section', '=', 'full_description')];
+            row groups that cannot match are not read
         
     Returns:
-        DataFrame with embeddings
+        DataFrame with embeddings (each a float32 numpy vector)
     """
     filepath = VECTORS_DIR / f"{filename}.parquet"
     
     if not filepath.exists():
         raise FileNotFoundError(f"Embeddings file not found: {filepath}")
     
-    df = pd.read_parquet(filepath)
+    arrow_path = filepath.with_suffix('.arrow')
+    
+    # Unfiltered loads map the float32 sibling instead of decoding parquet
+    if (EMBEDDING_ARROW_SIBLING and columns is None and filters is None and arrow_path.exists()
+            and arrow_path.stat().st_mtime >= filepath.stat().st_mtime):
+        table, _ = load_embeddings_arrow(filename)
+        df = _embeddings_frame(table)
+        print(f"✓ Mapped {len(df)} embeddings from: {arrow_path}")
+        return df
+    
+    # int8 embeddings are unreadable without their scales
+    if columns is not None and 'embedding' in columns and 'embedding_scale' not in columns:
+        if 'embedding_scale' in pq.read_schema(filepath).names:
+            columns = list(columns) + ['embedding_scale']
+    
+    df = _embeddings_frame(pq.read_table(filepath, columns=columns, filters=filters))
     print(f"✓ Loaded {len(df)} embeddings from: {filepath}")
     return df
 
 
+def save_embeddings_arrow(embeddings: Union[pa.Table, pd.DataFrame], filename: str) -> Path:
+    """
+    Save embeddings as an uncompressed Arrow IPC file next to the parquet.
+    
+    Embeddings are kept as float32 so a memory-mapped read can hand them
+    out without any conversion (see load_embeddings_arrow).
+    
+    Args:
+        embeddings: Table from _build_embeddings_table (or a DataFrame)
+        filename: Output filename (without extension)
+        
+    Returns:
+        Path to saved file
+    """
+    filepath = VECTORS_DIR / f"{filename}.arrow"
+    table = _embeddings_table(embeddings, np.float32)
+    table = table.replace_schema_metadata(_with_model_metadata(table.schema).metadata)
+    
+    # One record batch, so the embedding column maps as a single buffer.
+    # Written aside and swapped in: the old file may still be memory-mapped
+    with _replace_on_success(filepath) as tmp_path:
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    
+    print(f"✓ Saved embeddings to: {filepath}")
+    return filepath
+
+
+def load_embeddings_arrow(filename: str) -> Tuple[pa.Table, np.ndarray]:
+    """
+    Memory-map embeddings saved by save_embeddings_arrow.
+    
+    Args:
+        filename: Filename (without extension)
+        
+    Returns:
+        Tuple of (table, matrix): the Arrow table and its (n_rows, dim)
+        float32 embedding matrix, a read-only view into the mapped file
+    """
+    filepath = VECTORS_DIR / f"{filename}.arrow"
+    
+    if not filepath.exists():
+        raise FileNotFoundError(f"Embeddings file not found: {filepath}")
+    
+    table = pa.ipc.open_file(pa.memory_map(str(filepath), 'r')).read_all()
+    
+    if 'embedding' not in table.column_names or table.num_rows == 0:
+        return table, np.empty((0, 0), dtype=np.float32)
+    
+    return table, _embedding_matrix(table.column('embedding'))
+
+
+def is_up_to_date(filename: str, source: Path,
+                  resume_version: Optional[str] = None) -> bool:
+    """
+    Check whether a saved embeddings file can be reused as-is.
+    
+    Args:
+        filename: Embeddings filename (without extension)
+        source: Input file the embeddings were built from
+        resume_version: Version every row must carry (resume embeddings only)
+        
+    Returns:
+        True if the file is newer than source, was built with the current
+        EMBEDDING_MODEL and (if given) holds only resume_version rows
+    """
+    filepath = VECTORS_DIR / f"{filename}.parquet"
+    
+    if not filepath.exists() or not source.exists():
+        return False
+    if filepath.stat().st_mtime <= source.stat().st_mtime:
+        return False
+    
+    # Footer-only read; files from before model/normalization tagging count as stale
+    metadata = pq.read_schema(filepath).metadata or {}
+    if metadata.get(b'embedding_model') != EMBEDDING_MODEL.encode():
+        return False
+    if metadata.get(b'normalized') != b'l2':
+        return False
+    
+    if resume_version is not None:
+        versions = pq.read_table(filepath, columns=['resume_version']).column(0).unique()
+        return versions.to_pylist() == [resume_version]
+    
+    return True
+
+
 # =============================================
 # MAIN PIPELINE
 # =============================================
 
-def vectorize_all() -> Dict[str, Path]:
+def vectorize_all(force: bool = False) -> Dict[str, Path]:
     """
     Generate all embeddings (jobs + resume) and save to files.
     
+    A side whose file is already up to date (see is_up_to_date) is not
+    regenerated. Job embeddings are checked against the cleaned job cache,
+    which is deleted whenever staging.job_postings_clean changes.
+    
+    Args:
+        force: Regenerate both files even if they are up to date
+        
     Returns:
-        Dictionary with paths to saved files
+        Dictionary with paths to saved (or reused) files
     """
     saved_files = {}
-    
-    # Generate job embeddings
-    df_job_embeddings = generate_job_embeddings()
-    if not df_job_embeddings.empty:
-        saved_files['job_embeddings'] = save_embeddings(df_job_embeddings, 'job_embeddings')
-    
-    # Generate resume embeddings
-    df_resume_embeddings = generate_resume_embeddings()
-    if not df_resume_embeddings.empty:
-        saved_files['resume_embeddings'] = save_embeddings(df_resume_embeddings, 'resume_embeddings')
+    job_texts, job_columns = [], {}
+    resume_texts, resume_columns = [], {}
+    
+    # Collect texts only for the sides that need regenerating
+    if not force and is_up_to_date('job_embeddings', CLEAN_JOBS_CACHE):
+        print("✓ Job embeddings up to date - skipping")
+        saved_files['job_embeddings'] = VECTORS_DIR / 'job_embeddings.parquet'
+    else:
+        job_texts, job_columns = collect_job_texts()
+    
+    if not force and is_up_to_date('resume_embeddings', RESUME_FILE, CURRENT_RESUME_VERSION):
+        print("✓ Resume embeddings up to date - skipping")
+        saved_files['resume_embeddings'] = VECTORS_DIR / 'resume_embeddings.parquet'
+    else:
+        resume_texts, resume_columns = collect_resume_texts()
+    
+    # Job embeddings are encoded and written EMBEDDING_STREAM_ROWS at a time
+    if job_texts:
+        saved_files['job_embeddings'] = save_embeddings_streaming(job_texts, job_columns, 'job_embeddings')
+    
+    # Resume embeddings (tens of texts) in one batch
+    if resume_texts:
+        resume_embeddings = _build_embeddings_table(resume_columns, encode_texts(resume_texts))
+        saved_files['resume_embeddings'] = save_embeddings(resume_embeddings, 'resume_embeddings')
+        if EMBEDDING_ARROW_SIBLING:
+            save_embeddings_arrow(resume_embeddings, 'resume_embeddings')
     
     return saved_files
 
@@ -364,8 +994,8 @@ if __name__ == "__main__":
     print("VECTORIZATION MODULE")
     print("="*60)
     
-    # Run vectorization
-    saved_files = vectorize_all()
+    # Run vectorization (--force regenerates up-to-date files too)
+    saved_files = vectorize_all(force='--force' in sys.argv[1:])
     
     print("\n" + "="*60)
     print("VECTORIZATION COMPLETE")
@@ -1,85 +1,68 @@
 """Test database connection using pyodbc."""
 
 import pyodbc
-from dotenv import load_dotenv
-import os
 
-# Load environment variables
-load_dotenv()
+from src.config import DB_CONFIG
+from src.db_utils import managed_cursor, close_all_pools
+
 
 def test_connection():
     """Test connection to JobMatchPipeline database."""
-    
-    # Build connection string
-    server = os.getenv('DB_SERVER', 'localhost')
-    database = os.getenv('DB_DATABASE', 'JobMatchPipeline')
-    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-    
-    # Check if using SQL Auth or Windows Auth
-    username = os.getenv('DB_USERNAME')
-    password = os.getenv('DB_PASSWORD')
-    
-    if username and password:
-        # SQL Authentication
-        conn_str = (
-            f'DRIVER={{{driver}}};\
-SERVER={server};DATABASE={database};'
-            f'UID={username};PWD={password}'
-        )
-    else:
-        # Windows Authentication
-        conn_str = (
-            f'DRIVER={{{driver}}};'
-            f'SERVER={server};'
-            f'DATABASE={database};'
-            f'Trusted_Connection=yes;'
-        )
-    
+
+    # Connection string and pooling come from src.config / src.db_utils,
+    # the same path the pipeline uses
     print("Testing database connection...")
-    print(f"Server: {server}")
-    print(f"Database: {database}")
-    print(f"Driver: {driver}")
+    print(f"Server: {DB_CONFIG['server']}")
+    print(f"Database: {DB_CONFIG['database']}")
+    print(f"Driver: {DB_CONFIG['driver']}")
     print()
-    
+
     try:
-        # Attempt connection
-        conn = pyodbc.connect(conn_str)
-        print("✅ Connection successful!")
-        
-        # Test query
-        cursor = conn.cursor()
-        cursor.execute("SELECT @@VERSION")
-        version = cursor.fetchone()[0]
-        print(f"\nSQL Server Version:\n{version[:100]}...")
-        
-        # Check schemas exist
-        cursor.execute("""
-            SELECT name FROM sys.schemas 
-            WHERE name IN ('staging', 'results')
-            ORDER BY name
-        """)
-        schemas = [row[0] for row in cursor.fetchall()]
-        print(f"\nSchemas found: {schemas}")
-        
-        # Check tables exist
-        cursor.execute("""
-            SELECT 
-                SCHEMA_NAME(schema_id) as schema_name,
-                name as table_name
-            FROM sys.tables
-            ORDER BY SCHEMA_NAME(schema_id), name
-        """)
-        tables = cursor.fetchall()
-        print(f"\nTables found:")
-        for schema, table in tables:
-            print(f"  - {schema}.{table}")
-        
-        cursor.close()
-        conn.close()
-        
+        # Attempt connection (pooled)
+        with managed_cursor(action="Connection test") as (conn, cursor):
+            print("✅ Connection successful!")
+
+            # Test query
+            cursor.execute("SELECT @@VERSION")
+            version = cursor.fetchone()[0]
+            print(f"\nSQL Server Version:\n{version[:100]}...")
+
+            # Check schemas exist
+            cursor.execute("""
+                SELECT name FROM sys.schemas
+                WHERE name IN ('staging', 'results')
+                ORDER BY name
+            """)
+            schemas = [row[0] for row in cursor.fetchall()]
+            print(f"\nSchemas found: {schemas}")
+
+            # Check tables exist
+            cursor.execute("""
+                SELECT
+                    SCHEMA_NAME(schema_id) as schema_name,
+                    name as table_name
+                FROM sys.tables
+                ORDER BY SCHEMA_NAME(schema_id), name
+            """)
+            tables = cursor.fetchall()
+            print(f"\nTables found:")
+            for schema, table in tables:
+                print(f"  - {schema}.{table}")
+
+            # Check the driver supports array parameter binding, which the
+            # bulk insert helpers rely on (one round-trip per executemany)
+            cursor.execute("CREATE TABLE #fast_executemany_check (id INT, label NVARCHAR(50))")
+            cursor.fast_executemany = True
+            rows = [(i, f"row {i}") for i in range(100)]
+            cursor.executemany("INSERT INTO #fast_executemany_check (id, label) VALUES (?, ?)", rows)
+            cursor.execute("SELECT COUNT(*) FROM #fast_executemany_check")
+            inserted = cursor.fetchone()[0]
+            print(f"\nfast_executemany: {inserted}/{len(rows)} rows inserted in one batch")
+            cursor.execute("DROP TABLE #fast_executemany_check")
+
         print("\n✅ ALL DATABASE TESTS PASSED!")
         return True
-        
+
     except pyodbc.Error as e:
         print(f"\n❌ Connection failed!")
         print(f"Error: {e}")
@@ -90,5 +73,8 @@ SERVER={server};DATABASE={database};'
         print("4. If using SQL Auth, verify username/password in .env")
         return False
 
+    finally:
+        close_all_pools()
+
 if __name__ == "__main__":
-    test_connection()
\ No newline at end of file
+    test_connection()
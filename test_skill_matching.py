@@ -0,0 +1,39 @@
+"""Test that technology keywords only match as whole words."""
+
+from src.config import find_tech_keywords
+from src.preprocess import extract_skills
+
+
+def test_short_keywords_need_word_boundaries():
+    """'r' and 'ai' must not be found inside ordinary words."""
+    found = find_tech_keywords("professional experience; maintain reports, digital tools")
+    assert 'r' not in found, found
+    assert 'ai' not in found, found
+    assert 'git' not in found, found
+
+
+def test_keywords_with_symbols_still_match():
+    """Keywords with punctuation, and ones next to separators, still match."""
+    found = find_tech_keywords("c#, c++ and scikit-learn; r, ai/ml and power bi.")
+    for keyword in ['c#', 'c++', 'scikit-learn', 'r', 'ai', 'power bi']:
+        assert keyword in found, (keyword, found)
+
+
+def test_job_skills_use_the_same_word_boundaries():
+    """Job-side extract_skills finds the same keywords, in their original casing."""
+    text = "Professional who can maintain Digital reports in Power BI, SQL and R."
+    skills = extract_skills(text)
+    assert {skill.lower() for skill in skills} >= {'power bi', 'sql', 'r'}, skills
+    assert 'Power BI' in skills and 'R' in skills, skills
+    for keyword in ['ai', 'git']:
+        assert keyword not in {skill.lower() for skill in skills}, skills
+
+
+if __name__ == "__main__":
+    test_short_keywords_need_word_boundaries()
+    print("✓ Short keywords need word boundaries")
+    test_keywords_with_symbols_still_match()
+    print("✓ Keywords with symbols still match")
+    test_job_skills_use_the_same_word_boundaries()
+    print("✓ Job skills use the same word boundaries")
+    print("\n✅ ALL SKILL MATCHING TESTS PASSED!")